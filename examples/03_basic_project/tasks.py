@@ -11,8 +11,10 @@ def _output_dir(c: Context, configuration="Debug"):
 def build(c: Context, configuration="Debug", reconfigure=False):
     _ = c, configuration
 
-    c.mkdir(_output_dir(c, configuration))
-    cached_env = c.join(_output_dir(c, configuration), "vc_build.env")
+    output_dir = _output_dir(c, configuration)
+
+    c.mkdir(output_dir)
+    cached_env = c.join(output_dir, "vc_build.env")
     
     if not reconfigure and c.exists(cached_env):
         vc_env = load_env(cached_env)
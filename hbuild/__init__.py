@@ -1,23 +1,30 @@
 from __future__ import annotations
 
-from os.path import exists, isabs, join, splitext, basename, dirname, getmtime
+from os.path import exists, isabs, join, splitext, basename, dirname, getmtime, normcase
 from dataclasses import dataclass, field
-from contextlib import contextmanager
+from contextlib import contextmanager, closing
+from contextvars import ContextVar
 from enum import StrEnum, IntEnum, auto
 from collections import Counter
-from functools import lru_cache
+from functools import lru_cache, partial
+from typing import Any, Callable, Iterable
 from os import makedirs
-from copy import copy
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+import importlib
 import importlib.util
+import mmap
+import heapq
+import multiprocessing
+import threading
 import sys
+import os
 import hashlib
-import inspect
 import pickle
+import shutil
 import time
 
 
 from htask import Context
-from htask.progs import msvc, cmake
 
 __all__ = (
     "Target",
@@ -47,8 +54,21 @@ __all__ = (
     "pick_output_name",
 )
 
+def __getattr__(name: str):
+    # NOTE(gr3yknigh1): Toolchain modules are imported on first use, but stay reachable as `hbuild.msvc`
+    # and `hbuild.cmake`. [2025/06/18]
+    if name in ("msvc", "cmake"):
+        return importlib.import_module(f"htask.progs.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# NOTE(gr3yknigh1): Packages of executed build file are stored in module under this name, so cached module gives
+# them back without executing it again. [2025/06/18]
 HBUILD_MAGIC_PACKAGE_LIST_ATTR_NAME = "__hbuild_magic_package_list__"
 
+# NOTE(gr3yknigh1): Folder of object files shared between builds (like ccache does). Disabled if not set. [2025/06/18]
+HBUILD_CACHE_DIR_ENV_NAME = "HBUILD_CACHE_DIR"
+
 
 
 class BuildType(StrEnum):
@@ -56,22 +76,25 @@ class BuildType(StrEnum):
     RELEASE = "Release"
 
 
-class Architecture(StrEnum):
-    X86_64 = "x86_64"
-
-
 class Bitness(StrEnum):
     X32 = "x32"
     X64 = "x64"
 
 
-_ARCH_TO_BITNESS = {
-    Architecture.X86_64: Bitness.X64,
-}
+class Architecture(StrEnum):
+    X86_64 = ("x86_64", Bitness.X64)
+
+    bitness: Bitness
 
+    def __new__(cls, value: str, bitness: Bitness) -> Architecture:
+        member = str.__new__(cls, value)
+        member._value_ = value
+        member.bitness = bitness
+        return member
 
-def arch_to_bitness(arch: Architecture) -> Bitness | None:
-    return _ARCH_TO_BITNESS.get(arch, None)
+
+def arch_to_bitness(arch: Architecture) -> Bitness:
+    return Architecture(arch).bitness
 
 
 class TargetKind(IntEnum):
@@ -90,23 +113,31 @@ class Compiler(StrEnum):
 
     @staticmethod
     def detect_compiler() -> Compiler:
-        # TODO: Make more sofisticated algorithm... [2025/06/01]
-        return Compiler.MSVC
+        return _detect_compiler()
+
 
+# NOTE(gr3yknigh1): Detection will end up probing the system (vswhere, PATH lookup), so it is done
+# once per process. [2025/06/18]
+@lru_cache(maxsize=1)
+def _detect_compiler() -> Compiler:
+    # TODO: Make more sofisticated algorithm... [2025/06/01]
+    return Compiler.MSVC
 
+
+# NOTE(gr3yknigh1): Extensions are lowercase, lookups go through flat `_EXT_INDEX` below. [2025/06/18]
 _EXT_TO_LANGUAGE = {
-    "C": (
+    "C": frozenset({
         ".c",
         ".h",
-    ),
-    "CXX": (
+    }),
+    "CXX": frozenset({
         ".cpp",
         ".hpp",
         ".cxx",
         ".hxx",
         ".cc",
         ".hh",
-    )
+    })
 }
 
 
@@ -117,13 +148,24 @@ class Language(StrEnum):
     @classmethod
     def guess_from_ext(cls, path: str) -> Language | None:
         _, file_ext = splitext(path)
-        for lang, exts in _EXT_TO_LANGUAGE.items():
-            if file_ext in exts:
-                return cls(lang)
-        return None
+        return _guess_language_from_ext(file_ext)
+
+
+_EXT_INDEX: dict[str, Language] = {
+    ext: Language(lang)
+    for lang, exts in _EXT_TO_LANGUAGE.items()
+    for ext in exts
+}
+
+
+# NOTE(gr3yknigh1): Extensions are compared case-insensitively, so `.C` and `.CPP` from Windows file systems are
+# recognized too. [2025/06/18]
+@lru_cache(maxsize=1024)
+def _guess_language_from_ext(file_ext: str) -> Language | None:
+    return _EXT_INDEX.get(file_ext.lower(), None)
 
 
-@dataclass
+@dataclass(slots=True)
 class SourceFile:
     path: str
     language: Language
@@ -132,7 +174,81 @@ class SourceFile:
         ...
 
 
-@dataclass
+# NOTE(gr3yknigh1): Sources are resolved into `ResolvedSource` once per target and `Target.sources` is never
+# mutated. `str.replace` is kept on purpose: for single character it is much faster than `str.translate`
+# (~60ns vs ~1.9us on typical path). [2025/06/18]
+if sys.platform == "win32":
+    def to_native_path(path: str) -> str:
+        return path.replace("/", "\\")
+else:
+    def to_native_path(path: str) -> str:
+        return path
+
+
+@dataclass(slots=True)
+class ResolvedSource:
+    source: SourceFile
+
+    # NOTE(gr3yknigh1): Absolute path. `native_path` is the same path, but with platform separators
+    # which is passed to the compiler. [2025/06/18]
+    path: str
+    native_path: str
+
+    file_name: str
+    object_file: str
+
+    # NOTE(gr3yknigh1): Object file isn't named after the source, because other source of the target has the
+    # same name. Such source can't be compiled by batch with `/Fo` pointing to the folder. [2025/06/18]
+    unique_object_name: bool = False
+
+
+def resolve_source(
+    source: SourceFile,
+    *,
+    project_folder: str,
+    output_folder: str,
+    unique_object_name=False,
+) -> ResolvedSource:
+    path = source.path if isabs(source.path) else join(project_folder, source.path)
+    native_path = to_native_path(path)
+
+    file_name = basename(path)
+    name, _ = splitext(file_name)
+
+    if unique_object_name:
+        path_digest = hashlib.blake2b(normcase(path).encode("utf-8"), digest_size=4).hexdigest()
+        name = f"{name}.{path_digest}"
+
+    return ResolvedSource(
+        source=source,
+        path=path,
+        native_path=native_path,
+        file_name=file_name,
+        object_file=join(output_folder, f"{name}.obj"),
+        unique_object_name=unique_object_name,
+    )
+
+
+def resolve_sources(sources: list[SourceFile], *, project_folder: str, output_folder: str) -> list[ResolvedSource]:
+    """Resolves sources of one target. Sources with the same name (in different folders) get object files
+    with path digest in the name, so they don't overwrite each other.
+    """
+
+    resolved = [
+        resolve_source(source, project_folder=project_folder, output_folder=output_folder)
+        for source in sources
+    ]
+    object_files = Counter(normcase(source.object_file) for source in resolved)
+
+    return [
+        resolve_source(source.source, project_folder=project_folder, output_folder=output_folder, unique_object_name=True)
+        if object_files[normcase(source.object_file)] > 1
+        else source
+        for source in resolved
+    ]
+
+
+@dataclass(slots=True)
 class TargetProperties:
     includes: list[str] = field(default_factory=list)
     macros: dict[str, str] = field(default_factory=dict)
@@ -141,15 +257,17 @@ class TargetProperties:
     links: list[Target] = field(default_factory=list)
 
     def merge(self, other: TargetProperties) -> TargetProperties:
-        new = TargetProperties()
-
-        new.includes.extend(self.includes)
-        new.includes.extend(other.includes)
+        return TargetProperties(
+            includes=[*self.includes, *other.includes],
+            macros={**self.macros, **other.macros},
+        )
 
-        new.macros.update(**self.macros)
-        new.macros.update(**other.macros)
+    def extend_from(self, other: TargetProperties) -> TargetProperties:
+        """In-place version of `merge`."""
 
-        return new
+        self.includes.extend(other.includes)
+        self.macros.update(other.macros)
+        return self
 
 
 class Access(IntEnum):
@@ -201,7 +319,7 @@ def pick_output_folder(target: Target, conf: Configuration) -> str:
 
 
 # TODO(gr3yknigh1): Find better name for it. [2025/06/17]
-@dataclass
+@dataclass(slots=True)
 class TargetAttributes:
     output_name: str | Callable[[Target, Configuration], str] = field(default=pick_output_name)
     output_folder: str | Callable[[Target, Configuration], str] = field(default=pick_output_folder)
@@ -217,7 +335,7 @@ class TargetAttributes:
         return self.output_folder
 
 
-@dataclass
+@dataclass(slots=True)
 class Target:
     name: str
     kind: TargetKind
@@ -248,32 +366,103 @@ def configure(
     compiler=Compiler.detect_compiler(),
     build_type=BuildType.DEBUG,
     architecture=Architecture.X86_64,
+    reconfigure=False,
+    object_cache_folder: str | None = None,
+    multi_process_compilation=True,
 ) -> Configuration:
+    if object_cache_folder is None:
+        object_cache_folder = os.getenv(HBUILD_CACHE_DIR_ENV_NAME, None)
+
     conf = Configuration(
         prefix=prefix,
         build_file=build_file,
         compiler=compiler,
         build_type=build_type,
         architecture=architecture,
+        object_cache_folder=object_cache_folder,
+        multi_process_compilation=multi_process_compilation,
     )
 
     output = conf.get_output_folder()
-    makedirs(output, exist_ok=True)
+    _ensure_dir(output)
 
     if conf.compiler == Compiler.MSVC:
-        cached_env = c.join(output, "vc.env")
-
-        if exists(cached_env):
-            env = load_env(cached_env)
-        else:
-            env = msvc.extract_env_from_vcvars(c, arch=arch_to_bitness(architecture))
-            save_env(cached_env, env)
-        conf.environment.update(env)
+        # NOTE(gr3yknigh1): Running vcvars takes seconds, so it is deferred until something actually needs
+        # environment of the compiler. [2025/06/18]
+        conf._environment_loader = lambda: load_msvc_environment(c, conf, reconfigure=reconfigure)
 
     return conf
 
 
-@dataclass
+def load_msvc_environment(c: Context, conf: Configuration, *, reconfigure=False) -> dict[str, str]:
+    from htask.progs import msvc
+
+    bitness = conf.get_bitness()
+    cached_env = c.join(conf.get_output_folder(), f"vc.{bitness}.env")
+    vcvars = msvc.find_vcvars(c)
+
+    if not reconfigure and is_env_cache_fresh(cached_env, vcvars):
+        return load_env(cached_env)
+
+    env = msvc.extract_env_from_vcvars(c, arch=bitness, vcvars=vcvars)
+    save_env(cached_env, env)
+    return env
+
+
+HBUILD_LOCAL_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    path TEXT PRIMARY KEY,
+    digest BLOB NOT NULL,
+    options BLOB NOT NULL,
+    dependencies TEXT NOT NULL
+)
+"""
+
+# NOTE(gr3yknigh1): Several projects (e.g. parent and it's external child) may share the output folder, so
+# build file and prefix are part of the key. [2025/06/18]
+HBUILD_TREE_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS project_trees (
+    tree TEXT NOT NULL,
+    build_file TEXT NOT NULL,
+    prefix TEXT NOT NULL,
+    compiler TEXT NOT NULL,
+    build_type TEXT NOT NULL,
+    architecture TEXT NOT NULL,
+    artefacts TEXT NOT NULL,
+    properties BLOB NOT NULL,
+    PRIMARY KEY (tree, build_file, prefix, compiler, build_type, architecture)
+)
+"""
+
+
+class JobSlots:
+    """Number of compiler processes which all targets of the build may run at once."""
+
+    _free: int
+    _condition: threading.Condition
+
+    def __init__(self, count: int) -> None:
+        self._free = count
+        self._condition = threading.Condition()
+
+    def acquire(self, wanted: int) -> int:
+        """Waits for at least one free slot and takes up to `wanted` of them. Returns number of taken slots."""
+
+        with self._condition:
+            while self._free == 0:
+                self._condition.wait()
+
+            taken = min(max(1, wanted), self._free)
+            self._free -= taken
+            return taken
+
+    def release(self, count: int) -> None:
+        with self._condition:
+            self._free += count
+            self._condition.notify_all()
+
+
+@dataclass(slots=True)
 class Configuration:
     prefix: str
     build_file: str
@@ -281,89 +470,523 @@ class Configuration:
     build_type: BuildType
     architecture: Architecture
 
-    environment: dict[str, str] = field(default_factory=dict)
+    object_cache_folder: str | None = field(default=None)
+
+    # NOTE(gr3yknigh1): Pass `/MP` to batched `cl.exe` invocations. [2025/06/18]
+    multi_process_compilation: bool = field(default=True)
+
+    _local_cache: dict[str, ObjectCacheEntry] = field(default_factory=dict)
+    _local_cache_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    # NOTE(gr3yknigh1): Entries as they are stored in database. Used to write back only changed ones. [2025/06/18]
+    _loaded_cache: dict[str, ObjectCacheEntry] = field(default_factory=dict, init=False, repr=False)
+
+    _file_stats: dict[str, os.stat_result] = field(default_factory=dict, init=False, repr=False)
 
-    _local_cache: dict[str, str] = field(default_factory=dict)
+    # NOTE(gr3yknigh1): Path -> (mtime in ns, size, digest). [2025/06/18]
+    _file_digests: dict[str, tuple[int, int, bytes]] = field(default_factory=dict, init=False, repr=False)
+
+    # NOTE(gr3yknigh1): Source -> (options digest, [(file, digest), ...]), where files are the source and
+    # every header it includes. [2025/06/18]
+    _include_files: dict[str, tuple[bytes, list[tuple[str, bytes]]]] = field(default_factory=dict, init=False, repr=False)
+
+    # NOTE(gr3yknigh1): Prefix, architecture and build type do not change after construction, so paths which
+    # depend on them are computed once. [2025/06/18]
+    _bitness: Bitness | None = field(default=None, init=False, repr=False)
+    _output_folder: str = field(default="", init=False, repr=False)
+    _project_folder: str = field(default="", init=False, repr=False)
+    _normalized_includes: dict[str, str] = field(default_factory=dict, init=False, repr=False)
+
+    _compiled_targets: dict[int, TargetProperties] = field(default_factory=dict, init=False, repr=False)
+
+    # NOTE(gr3yknigh1): Targets are compiled in parallel and each `cl.exe` may run several processes with
+    # `/MP`, so all of them share one budget of processes. [2025/06/18]
+    _job_slots: JobSlots = field(default_factory=lambda: JobSlots(os.cpu_count() or 1), init=False, repr=False)
+
+    # NOTE(gr3yknigh1): Outputs of linked (or already up-to-date) targets of the current build. [2025/06/18]
+    _artefacts: list[str] = field(default_factory=list, init=False, repr=False)
+
+    _environment: dict[str, str] | None = field(default=None, init=False, repr=False)
+    _environment_loader: Callable[[], dict[str, str]] | None = field(default=None, init=False, repr=False)
+    _environment_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _environment_block: dict[str, str] | None = field(default=None, init=False, repr=False)
+    _compiler_environment_block: dict[str, str] | None = field(default=None, init=False, repr=False)
+
+    def get_environment_block(self) -> dict[str, str]:
+        """Environment of this process with compiler environment applied. Passed to processes as is, without
+        merging it again for each of them.
+        """
+
+        if self._environment_block is None:
+            self._environment_block = {**os.environ, **self.environment}
+        return self._environment_block
+
+    def get_compiler_environment_block(self) -> dict[str, str]:
+        """Same as `get_environment_block`, but only with part of compiler environment which is needed
+        without linking.
+        """
+
+        from htask.progs import msvc
+
+        if self._compiler_environment_block is None:
+            self._compiler_environment_block = {**os.environ, **msvc.split_vc_env(self.environment).compiler}
+        return self._compiler_environment_block
+
+    @property
+    def environment(self) -> dict[str, str]:
+        if self._environment is None:
+            with self._environment_lock:
+                if self._environment is None:
+                    loader = self._environment_loader
+                    self._environment = loader() if loader is not None else {}
+        return self._environment
+
+    def __post_init__(self) -> None:
+        self._bitness = Architecture(self.architecture).bitness
+        self._output_folder = join(self.prefix, self._bitness, self.build_type)
+        self._project_folder = dirname(self.build_file)
 
     def load_local_cache(self, file: str) -> None:
-        if exists(file):
-            with open(file, "rb+") as f:
-                loaded = pickle.load(f)
-                assert isinstance(loaded, dict)
-            self._local_cache.update(loaded)
+        """Loads object cache from SQLite database."""
+
+        import sqlite3
+
+        if not exists(file):
+            return
+
+        with closing(sqlite3.connect(file)) as connection:
+            connection.execute(HBUILD_LOCAL_CACHE_SCHEMA)
+            rows = connection.execute("SELECT path, digest, options, dependencies FROM objects").fetchall()
+
+        for path, digest, options, dependencies in rows:
+            entry = ObjectCacheEntry(
+                digest=digest,
+                options=options,
+                dependencies=dependencies.split("\n") if len(dependencies) > 0 else [],
+            )
+            self._local_cache[path] = entry
+            self._loaded_cache[path] = entry
 
     def save_local_cache(self, file: str) -> None:
+        """Writes entries which were added or replaced since `load_local_cache`.
+
+        Concurrent builds with the same output folder only replace rows they changed.
+        """
+
+        import sqlite3
+
+        changed = [
+            (path, entry.digest, entry.options, "\n".join(entry.dependencies))
+            for path, entry in self._local_cache.items()
+            if self._loaded_cache.get(path, None) is not entry
+        ]
+
+        if len(changed) == 0:
+            return
+
+        with closing(sqlite3.connect(file)) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(HBUILD_LOCAL_CACHE_SCHEMA)
+
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO objects (path, digest, options, dependencies) VALUES (?, ?, ?, ?)",
+                    changed,
+                )
+
+        for path, *_ in changed:
+            self._loaded_cache[path] = self._local_cache[path]
+
+    def _get_tree_cache_key(self) -> tuple[str, str, str, str, str]:
+        return (
+            normcase(os.path.abspath(self.build_file)),
+            normcase(os.path.abspath(self.prefix)),
+            str(self.compiler),
+            str(self.build_type),
+            str(self.architecture),
+        )
+
+    def load_tree_cache(self, file: str, tree: str) -> TargetProperties | None:
+        """Returns properties of the project built from the same source tree with the same configuration, if
+        all of its artefacts still exist.
+        """
+
+        import sqlite3
+
+        if not exists(file):
+            return None
+
+        with closing(sqlite3.connect(file)) as connection:
+            connection.execute(HBUILD_TREE_CACHE_SCHEMA)
+            row = connection.execute(
+                "SELECT artefacts, properties FROM project_trees WHERE tree = ? AND build_file = ? AND prefix = ? "
+                "AND compiler = ? AND build_type = ? AND architecture = ?",
+                (tree, *self._get_tree_cache_key()),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        artefacts, properties = row
+
+        if len(artefacts) > 0 and not all(exists(artefact) for artefact in artefacts.split("\n")):
+            return None
+
+        return pickle.loads(properties)
+
+    def save_tree_cache(self, file: str, tree: str, properties: TargetProperties) -> None:
+        import sqlite3
+
+        with closing(sqlite3.connect(file)) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(HBUILD_TREE_CACHE_SCHEMA)
+
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO project_trees "
+                    "(tree, build_file, prefix, compiler, build_type, architecture, artefacts, properties) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        tree,
+                        *self._get_tree_cache_key(),
+                        "\n".join(self._artefacts),
+                        pickle.dumps(properties),
+                    ),
+                )
+
+    def load_file_cache(self, file: str) -> None:
+        """Loads digests of files and include lists of sources."""
 
-        # Merge existing cache entries
         if exists(file):
             with open(file, "rb") as f:
                 loaded = pickle.load(f)
-                self._local_cache.update(loaded)
+                assert isinstance(loaded, dict)
+            self._file_digests.update(loaded.get("digests", {}))
+            self._include_files.update(loaded.get("includes", {}))
 
-        with open(file, "wb+") as f:
-            pickle.dump(self._local_cache, f)
+    def save_file_cache(self, file: str) -> None:
+        """Saves digests of files and include lists of sources.
 
-    def get_local_cache(self) -> dict[str, str]:
-        return self._local_cache
+        Entries which are already in the file are kept, since other project (e.g. external one built by
+        this) may share the output folder. Entries of this configuration win.
+        """
 
-    def get_output_folder(self):
-        return join(
-            self.prefix,
-            arch_to_bitness(self.architecture),
-            self.build_type,
+        digests: dict[str, tuple[int, int, bytes]] = {}
+        includes: dict[str, tuple[bytes, list[tuple[str, bytes]]]] = {}
+
+        if exists(file):
+            try:
+                with open(file, "rb") as f:
+                    loaded = pickle.load(f)
+                if isinstance(loaded, dict):
+                    digests.update(loaded.get("digests", {}))
+                    includes.update(loaded.get("includes", {}))
+            except (OSError, EOFError, pickle.UnpicklingError):
+                pass
+
+        digests.update(self._file_digests)
+        includes.update(self._include_files)
+
+        # NOTE(gr3yknigh1): Written to temporary file first, so the cache is never seen half-written.
+        # [2025/06/18]
+        temporary_file = f"{file}.{os.getpid()}.tmp"
+        with open(temporary_file, "wb") as f:
+            pickle.dump(dict(digests=digests, includes=includes), f)
+        os.replace(temporary_file, file)
+
+    def get_include_files(self, source_file: str, options: bytes) -> list[str] | None:
+        """Returns headers which source included last time, if neither source nor any of them has changed since."""
+
+        cached = self._include_files.get(source_file, None)
+        if cached is None or cached[0] != options:
+            return None
+
+        try:
+            for file, digest in cached[1]:
+                if self.get_file_digest(file) != digest:
+                    return None
+        except OSError:
+            return None
+
+        return [file for file, _ in cached[1][1:]]
+
+    def set_include_files(self, source_file: str, options: bytes, include_files: list[str]) -> None:
+        self._include_files[source_file] = (
+            options,
+            [(file, self.get_file_digest(file)) for file in (source_file, *include_files)],
         )
 
-    def get_project_folder(self):
-        return dirname(self.build_file)
+    def get_file_stat(self, file: str) -> os.stat_result:
+        """Stats file once per configuration.
+
+        Only for inputs of the build (sources and headers), which are not expected to change while it runs.
+        """
+
+        result = self._file_stats.get(file, None)
+        if result is None:
+            result = os.stat(file)
+            self._file_stats[file] = result
+        return result
+
+    def get_file_digest(self, file: str, *, compute: Callable[[str], bytes] | None = None) -> bytes:
+        """Returns digest of file content.
+
+        Digest is recomputed only when modification time or size of the file differs from the ones
+        it was computed for.
+        """
+
+        stat = self.get_file_stat(file)
+        cached = self._file_digests.get(file, None)
+
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        digest = compute(file) if compute is not None else compute_file_digest(file)
+        self._file_digests[file] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def prefetch_file_digests(self, source_files: list[str]) -> None:
+        """Computes digests of sources and headers they included last time, if there are many changed ones.
+
+        All of them are hashed at once by worker processes, so later `get_file_digest` calls find them ready.
+        """
+
+        files: dict[str, None] = {}
+
+        for source_file in source_files:
+            files[source_file] = None
+
+            cached = self._include_files.get(source_file, None)
+            if cached is not None:
+                files.update(dict.fromkeys(file for file, _ in cached[1]))
+
+        stale: list[str] = []
+
+        for file in files:
+            try:
+                stat = self.get_file_stat(file)
+            except OSError:
+                continue
+
+            cached = self._file_digests.get(file, None)
+            if cached is None or cached[0] != stat.st_mtime_ns or cached[1] != stat.st_size:
+                stale.append(file)
+
+        if len(stale) < HBUILD_HASH_PROCESS_POOL_THRESHOLD:
+            return
+
+        executor = get_hash_executor()
+        chunksize = max(1, len(stale) // ((os.cpu_count() or 1) * 4))
+
+        for file, digest in zip(stale, executor.map(compute_file_digest, stale, chunksize=chunksize)):
+            stat = self.get_file_stat(file)
+            self._file_digests[file] = (stat.st_mtime_ns, stat.st_size, digest)
+
+    def get_local_cache(self) -> dict[str, ObjectCacheEntry]:
+        return self._local_cache
+
+    def get_local_cache_lock(self) -> threading.Lock:
+        """Lock which guards local cache. It is shared by all targets, since they are compiled in parallel."""
+        return self._local_cache_lock
+
+    def get_job_slots(self) -> JobSlots:
+        return self._job_slots
 
+    def get_compiled_targets(self) -> dict[int, TargetProperties]:
+        """Public properties of targets which were already compiled with this configuration, keyed by `id`."""
+        return self._compiled_targets
 
-@dataclass
+    def get_bitness(self) -> Bitness:
+        return self._bitness
+
+    def get_output_folder(self) -> str:
+        return self._output_folder
+
+    def get_project_folder(self) -> str:
+        return self._project_folder
+
+    def normalize_include(self, include: str) -> str:
+        """Makes include folder absolute (relative to project folder) with platform separators.
+
+        Same includes are propagated to many targets, so results are remembered.
+        """
+
+        normalized = self._normalized_includes.get(include, None)
+        if normalized is None:
+            normalized = to_native_path(include if isabs(include) else join(self._project_folder, include))
+            self._normalized_includes[include] = normalized
+        return normalized
+
+    def get_cached_object_path(self, key: str) -> str | None:
+        if self.object_cache_folder is None:
+            return None
+        return join(self.object_cache_folder, key[:2], f"{key[2:]}.obj")
+
+
+@dataclass(slots=True)
+class ObjectCacheEntry:
+    digest: bytes
+    options: bytes
+
+    # NOTE(gr3yknigh1): Source file and all headers it includes. Used for timestamp check. [2025/06/05]
+    dependencies: list[str] = field(default_factory=list)
+
+
+# NOTE(gr3yknigh1): Folders which are known to exist during this process. Saves `stat`/`mkdir` syscalls on
+# incremental builds. [2025/06/18]
+_mkdir_cache: set[str] = set()
+_mkdir_cache_lock = threading.Lock()
+
+
+def _ensure_dir(folder: str) -> None:
+    if folder in _mkdir_cache:
+        return
+
+    # NOTE(gr3yknigh1): Targets are compiled in parallel, so only one thread creates the folder while
+    # others wait for it instead of racing through `makedirs`. [2025/06/18]
+    with _mkdir_cache_lock:
+        if folder in _mkdir_cache:
+            return
+        makedirs(folder, exist_ok=True)
+        _mkdir_cache.add(folder)
+
+
+def is_up_to_date(file: str, dependencies: list[str], *, stat: Callable[[str], os.stat_result] = os.stat) -> bool:
+    """Checks that file exists and newer than every of it's dependencies.
+
+    :param stat: Used to stat dependencies, so callers can reuse results of previous calls.
+    """
+
+    try:
+        file_mtime = os.stat(file).st_mtime_ns
+        for dependency in dependencies:
+            if stat(dependency).st_mtime_ns > file_mtime:
+                return False
+    except OSError:
+        return False
+
+    return True
+
+
+def store_file(file: str, destination: str) -> None:
+    """Copies file, so it appears at destination atomically."""
+
+    _ensure_dir(dirname(destination))
+
+    temporary = f"{destination}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.copyfile(file, temporary)
+    os.replace(temporary, destination)
+
+
+@dataclass(slots=True)
 class Package:
     name: str
     targets: Target
 
 
+HBUILD_HASH_MMAP_THRESHOLD = 64 * 1024
+
+
+# NOTE(gr3yknigh1): Digests are used only by build caches, so there is no need in slow cryptographic SHA-256.
+# BLAKE2b is much faster per byte. Files smaller than chunk (which is most of sources) are read at
+# once. [2025/06/18]
+#
 # TODO(gr3yknigh1): For some reason `lru_cache` mess up hashing for include files. There is no cache hits, when
 # it's turned on. Investigate later! [2025/06/05]
 #@lru_cache(maxsize=1024)
-def compute_file_hash(file_path, *, algorithm="sha256", chunk_size=8192):
-    hash = hashlib.new(algorithm)
+def compute_file_hash(file_path, *, algorithm="blake2b", chunk_size=1024 * 1024):
+    hash = hashlib.new(algorithm, digest_size=32) if algorithm == "blake2b" else hashlib.new(algorithm)
     
-    with open(file_path, 'rb') as f:
-
-        chunk: bytes = f.read(chunk_size)
-        while len(chunk) > 0:
-            hash.update(chunk)
-            chunk = f.read(chunk_size)
+    # NOTE(gr3yknigh1): Unbuffered, since bytes are read straight into reusable buffer below. [2025/06/18]
+    with open(file_path, 'rb', buffering=0) as f:
+
+        # NOTE(gr3yknigh1): Big files are mapped, so their bytes go to the hash without copies and Python
+        # loop. If mapping fails (some file systems), chunked read below is used. [2025/06/18]
+        if os.fstat(f.fileno()).st_size > HBUILD_HASH_MMAP_THRESHOLD:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    hash.update(mapped)
+                return hash
+            except (OSError, ValueError):
+                pass
+
+        chunk = get_hash_buffer(chunk_size)
+        size = f.readinto(chunk)
+        while size > 0:
+            hash.update(chunk[:size])
+
+            if size < chunk_size:
+                break
+
+            size = f.readinto(chunk)
     
     return hash
 
 
-def add_package(name: str, *, targets: list[Target]) -> Package:
-    frame = inspect.currentframe()
-    
-    try:
-        current = frame
-        while HBUILD_MAGIC_PACKAGE_LIST_ATTR_NAME not in current.f_globals.keys():
-            current = current.f_back
-        else:
+_hash_buffers = threading.local()
 
-            new = Package(name, targets)
 
-            packages: list[Package] | None = current.f_globals.get(HBUILD_MAGIC_PACKAGE_LIST_ATTR_NAME, None)
-            assert packages is not None
+def get_hash_buffer(size: int) -> memoryview:
+    """Returns buffer of given size for reading files, which is reused by all hashing done by this thread."""
 
-            for package in packages:
-                if package.name == new:
-                    raise Exception(f"Found package with the same name as new! new={new!r} old={package!r}")
+    buffer: bytearray | None = getattr(_hash_buffers, "buffer", None)
+    if buffer is None or len(buffer) < size:
+        buffer = bytearray(size)
+        _hash_buffers.buffer = buffer
+    return memoryview(buffer)[:size]
 
-            packages.append(new)
-            return new
 
-    finally:
-        del frame
+def compute_file_digest(file_path: str) -> bytes:
+    return compute_file_hash(file_path).digest()
+
 
-    raise Exception("Failed to find magic list of packages! You might be called not from build file?")
+# NOTE(gr3yknigh1): When many files of the target changed (e.g. after switching branches), they are hashed in
+# worker processes, so hashing does not fight for the GIL with threads which check sources and wait on
+# compiler. For fewer files starting the workers costs more than it saves. [2025/06/18]
+HBUILD_HASH_PROCESS_POOL_THRESHOLD = 256
+
+_hash_executor: ProcessPoolExecutor | None = None
+_hash_executor_lock = threading.Lock()
+
+
+def get_hash_executor() -> ProcessPoolExecutor:
+    global _hash_executor
+
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            _hash_executor = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _hash_executor
+
+
+def compute_translation_unit_digest(source_digest: bytes, include_digests: list[bytes], *, salt: bytes) -> bytes:
+    """Hashes translation unit from digests of the source and every header it includes."""
+
+    return hashlib.sha256(b"".join([source_digest, salt, *include_digests])).digest()
+
+
+# NOTE(gr3yknigh1): Packages of build file which is being executed right now. Set by `load_build_file`. [2025/06/18]
+_current_packages: ContextVar[list[Package]] = ContextVar("_current_packages")
+
+
+def add_package(name: str, *, targets: list[Target]) -> Package:
+    packages = _current_packages.get(None)
+
+    if packages is None:
+        raise Exception("Failed to find list of packages! You might be called not from build file?")
+
+    new = Package(name, targets)
+
+    for package in packages:
+        if package.name == new.name:
+            raise Exception(f"Found package with the same name as new! new={new!r} old={package!r}")
+
+    packages.append(new)
+    return new
     
 
 def add_library(name: str, sources: list[str] | None = None, *, dynamic=False) -> Target:
@@ -377,7 +1000,7 @@ class BuildTool(IntEnum):
     CMAKE = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class ExternalBuildProps:
     tool: BuildTool
     location: str
@@ -452,7 +1075,18 @@ def add_target(
     return target
 
 
-def compile_target(c: Context, *, conf: Configuration, package: Package, target: Target, reporter: Reporter | None = None) -> TargetProperies:
+def get_target_links(target: Target) -> list[Target]:
+    return [link for properties in target.properties.values() for link in properties.links]
+
+
+def compile_target(
+    c: Context,
+    *,
+    conf: Configuration,
+    package: Package,
+    target: Target,
+    reporter: Reporter | None = None,
+) -> TargetProperties:
     """ Compiles the target and it's dependencies.
 
     :returns: All public properties, propagated from the bottom of dependency graph.
@@ -461,9 +1095,29 @@ def compile_target(c: Context, *, conf: Configuration, package: Package, target:
     if reporter is None:
         reporter = NullReporter()
 
+    compiled = compile_targets(c, conf=conf, roots=[(target, package)], reporter=reporter)
+    return compiled[id(target)]
+
+
+def _compile_single_target(
+    c: Context,
+    *,
+    conf: Configuration,
+    package: Package,
+    target: Target,
+    reporter: Reporter,
+    compiled: dict[int, TargetProperties],
+) -> TargetProperties:
+    """ Compiles only the target itself. All targets it links with should be already compiled.
+
+    :param compiled: Public properties of already compiled targets, keyed by `id` of target.
+    :returns: All public properties, propagated from the bottom of dependency graph.
+    """
+
+    # NOTE(gr3yknigh1): Copied, because properties of dependencies are merged into it in-place. [2025/06/18]
     public_props = TargetProperties(
-        macros=target.properties[Access.PUBLIC].macros,
-        includes=target.properties[Access.PUBLIC].includes,
+        macros=dict(target.properties[Access.PUBLIC].macros),
+        includes=list(target.properties[Access.PUBLIC].includes),
     )
 
     # TODO(gr3yknigh1): This breaks the external builds... Public props not filled with parsed information about packages. [2025/06/05]
@@ -488,17 +1142,19 @@ def compile_target(c: Context, *, conf: Configuration, package: Package, target:
                 reporter=reporter,
             )
 
-            for index, include in enumerate(copy(result_props.includes)):
-                if not isabs(include):
-                    result_props.includes[index] = join(target.external_build.location, include)
+            result_props.includes = [
+                include if isabs(include) else join(target.external_build.location, include)
+                for include in result_props.includes
+            ]
 
-            public_props = public_props.merge(result_props)
+            public_props.extend_from(result_props)
             
         elif external_build.tool == BuildTool.CMAKE:
             # TODO(gr3yknigh1): Find better way of handling properties of external dependencies. [2025/06/03]
+            from htask.progs import cmake
 
             target_output_folder = join(conf.get_output_folder(), ".external.cmake", target.name)
-            makedirs(target_output_folder, exist_ok=True)
+            _ensure_dir(target_output_folder)
 
             cmake.configure(
                 c,
@@ -523,6 +1179,7 @@ def compile_target(c: Context, *, conf: Configuration, package: Package, target:
 
     # This is used to compile current target.
     libraries = []
+    link_artefacts = []
     includes = []
     macros = {}
 
@@ -537,35 +1194,44 @@ def compile_target(c: Context, *, conf: Configuration, package: Package, target:
         for link_target in props.links:
 
             # Propagated properties from the bottom of dependency graph. 
-            link_public_props: TargetProperties = compile_target(c, conf=conf, package=package, target=link_target, reporter=reporter)
+            link_public_props = compiled[id(link_target)]
 
             includes.extend(link_public_props.includes)
             macros.update(**link_public_props.macros)
 
-            libraries.append(link_target.get_artefact_path(conf))
-            public_props = public_props.merge(link_public_props)
+            link_artefact = link_target.get_artefact_path(conf)
+            libraries.append(link_artefact)
+            link_artefacts.append(link_artefact)
+            public_props.extend_from(link_public_props)
 
-    sources = []
-    for source in target.sources:
-        if not isabs(source.path):
-            source.path = join(conf.get_project_folder(), source.path)
-        sources.append(source)
+    # NOTE(gr3yknigh1): In diamond-like graphs same includes and libraries come from several dependencies.
+    # Duplicates are dropped keeping the order, which matters for search paths. [2025/06/18]
+    public_props.includes = list(dict.fromkeys(public_props.includes))
+    libraries = list(dict.fromkeys(libraries))
+    link_artefacts = list(dict.fromkeys(link_artefacts))
 
-    lost_sources = [source for source in sources if not exists(source.path)]
+    target_output_prefix = join(conf.get_output_folder(), target.name)
+    project_folder = conf.get_project_folder()
+
+    # NOTE(gr3yknigh1): Resolved paths are kept aside, so `Target.sources` stays untouched and
+    # the target can be compiled with another configuration. [2025/06/18]
+    sources = resolve_sources(target.sources, project_folder=project_folder, output_folder=target_output_prefix)
+
+    # NOTE(gr3yknigh1): Sources of the target mostly live in few folders, so each of them is listed once
+    # instead of stat-ing every source. [2025/06/18]
+    lost_sources = [
+        source.source
+        for source, is_present in zip(sources, c.exists_many([source.path for source in sources]))
+        if not is_present
+    ]
     if len(lost_sources) > 0:
         raise Exception(
             f"Non-existing sources was found! lost_sources={lost_sources!r}"
         )
 
-    target_output_prefix = join(conf.get_output_folder(), target.name)
-    makedirs(target_output_prefix, exist_ok=True)
+    _ensure_dir(target_output_prefix)
  
-    for index, include in enumerate(copy(includes)):
-        if not isabs(include):
-            includes[index] = join(conf.get_project_folder(), include)
-
-    if sys.platform == "win32":
-        includes = [include.replace("/", "\\") for include in includes]
+    includes = list(dict.fromkeys(conf.normalize_include(include) for include in includes))
 
     output = target.get_artefact_path(conf)
     output_filename, _ = splitext(output)
@@ -573,9 +1239,14 @@ def compile_target(c: Context, *, conf: Configuration, package: Package, target:
     is_debug = conf.build_type == BuildType.DEBUG
 
     if conf.compiler == Compiler.MSVC:
+        # NOTE(gr3yknigh1): Toolchain modules are imported only when they are used, to keep startup of CLI
+        # fast. [2025/06/18]
+        from htask.progs import msvc
+
         # TODO(gr3yknigh1): Expose to the user the libraries which he want's to link [2025/06/02]
         libraries.extend(["kernel32.lib", "user32.lib", "gdi32.lib"])
         object_files: list[str] = []
+        has_recompiled_objects = False
 
         # TODO(gr3yknigh1): Expose this option via platform-specific API configurations [2025/06/03]
         runtime_library = (
@@ -585,7 +1256,7 @@ def compile_target(c: Context, *, conf: Configuration, package: Package, target:
         )
 
         debug_info_mode = (
-            msvc.DebugInfoMode.FULL
+            msvc.DebugInfoMode.FASTLINK
             if is_debug
             else msvc.DebugInfoMode.NONE
         )
@@ -596,28 +1267,69 @@ def compile_target(c: Context, *, conf: Configuration, package: Package, target:
             else msvc.OptimizationLevel.MAXIMIZE_SPEED
         )
 
-        for source in sources:
-
-            source_file_name = basename(source.path)
-            source_name, source_ext = splitext(source_file_name)
-            object_file = join(target_output_prefix, f"{source_name}.obj")
+        # NOTE(gr3yknigh1): Includes and macros are the same for every translation unit of the
+        # target, so they are hashed once. [2025/06/18]
+        options_hash = hashlib.sha256(
+            repr((optimization_level, runtime_library, includes, sorted(macros.items()))).encode("utf-8")
+        )
 
+        # NOTE(gr3yknigh1): Values which are used for every translation unit are bound to locals once per
+        # target. [2025/06/18]
+        environment = conf.environment
+        environment_block = conf.get_environment_block()
+        compiler_environment_block = conf.get_compiler_environment_block()
+        count_increment = reporter.count_increment
+        mesure_time = reporter.mesure_time
+        timer_prefix = f"compile:{package.name}.{target.name}"
+
+        # NOTE(gr3yknigh1): Environment from vcvars pins version of the toolchain. [2025/06/18]
+        options_hash.update(repr(sorted(environment.items())).encode("utf-8"))
+
+        # NOTE(gr3yknigh1): Enum members used for every translation unit are looked up once per target and
+        # captured by the closures below. [2025/06/18]
+        language_c = Language.C
+        language_standard_c = msvc.LanguageStandard.C_LATEST
+        language_standard_cxx = msvc.LanguageStandard.CXX_LATEST
+        exception_handle = msvc.ExceptionHandle.HANDLE_CXX_SEH
+
+        def get_language_standard(resolved: ResolvedSource) -> msvc.LanguageStandard:
             # NOTE(gr3yknigh1): Currently supporting C and C++ ;C [2025/06/03]
-            language_standard = (
-                msvc.LanguageStandard.C_LATEST
-                if source.language == Language.C
-                else msvc.LanguageStandard.CXX_LATEST
-            )
-
-            if not isabs(source.path):
-                source_path = join(c.cwd(), source.path)
-            else:
-                source_path = source.path
-
-            if sys.platform == "win32":
-                source_path = source_path.replace("/", "\\")
-
-            assert exists(source.path)
+            return language_standard_c if resolved.source.language == language_c else language_standard_cxx
+
+        def get_options_digest(language_standard: msvc.LanguageStandard) -> bytes:
+            source_options_hash = options_hash.copy()
+            source_options_hash.update(language_standard.value.encode("utf-8"))
+            return source_options_hash.digest()
+
+        def check_source(
+            resolved: ResolvedSource
+        ) -> tuple[ResolvedSource, bool, tuple[bytes, ObjectCacheEntry | None, str | None] | None]:
+            """Checks single translation unit against the caches.
+
+            Returns the source, was its object file changed and, if it still has to be compiled, digest of
+            options, the pending cache entry (if it is known before compilation) with path of object file in
+            shared cache.
+            """
+
+            source_file = resolved.path
+            source_file_name = resolved.file_name
+            source_path = resolved.native_path
+            object_file = resolved.object_file
+            language_standard = get_language_standard(resolved)
+
+            options_digest = get_options_digest(language_standard)
+
+            with lock:
+                cache_entry = local_cache.get(object_file, None)
+
+            if (
+                isinstance(cache_entry, ObjectCacheEntry)
+                and cache_entry.options == options_digest
+                and is_up_to_date(object_file, cache_entry.dependencies, stat=conf.get_file_stat)
+            ):
+                with lock:
+                    count_increment("cache:hit")
+                return resolved, False, None
 
             #
             # NOTE(gr3yknigh1):
@@ -640,65 +1352,286 @@ def compile_target(c: Context, *, conf: Configuration, package: Package, target:
             # [2025/06/05]
             #
             
-            source_include_files = msvc.show_includes(
-                c, source_path,
-                includes=includes,
-                macros=macros,
-                language_standard=language_standard,
-                exception_handle=msvc.ExceptionHandle.HANDLE_CXX_SEH,
-                env=conf.environment,
-                quiet=True,
-            )
+            # NOTE(gr3yknigh1): Headers are scanned again only when the source, one of headers it included
+            # or compile options has changed. [2025/06/18]
+            source_include_files = conf.get_include_files(source_file, options_digest)
+
+            if source_include_files is None:
+
+                # NOTE(gr3yknigh1): Without shared cache digest is not needed before compilation. The source
+                # is compiled right away and headers are taken from `/sourceDependencies` output, which saves
+                # separate `/showIncludes` run. [2025/06/18]
+                if not use_shared_cache:
+                    with lock:
+                        count_increment("cache:miss")
+                    return resolved, True, (options_digest, None, None)
+
+                source_include_files = show_includes_many(
+                    [source_path], language_standard=language_standard
+                )[source_path]
+                conf.set_include_files(source_file, options_digest, source_include_files)
+            else:
+                with lock:
+                    count_increment("show_includes:skip")
 
-            # TODO(gr3yknigh1): Stop computing hash for each source file. Check timestamp of last change! [2025/06/05]
+            with mesure_time(f"{timer_prefix}.{source_file_name}:compute_hash"):
+                source_hash_digest = compute_source_digest(source_file, source_include_files, language_standard)
 
-            with reporter.mesure_time(f"compile:{package.name}.{target.name}.{source_file_name}:compute_hash"):
-                source_hash = compute_file_hash(source.path)
-                source_hash.update(language_standard.value.encode("utf-8"))
-                source_hash.update(bytes(int(optimization_level.value)))
-                for source_include_file in source_include_files:
-                    source_include_file_hash = compute_file_hash(source_include_file)
-                    source_hash.update(source_include_file_hash.digest())
+            new_cache_entry = ObjectCacheEntry(
+                digest=source_hash_digest,
+                options=options_digest,
+                dependencies=[source_file, *source_include_files],
+            )
 
-            local_cache = conf.get_local_cache()
+            if (
+                isinstance(cache_entry, ObjectCacheEntry)
+                and cache_entry.digest == source_hash_digest
+                and cache_entry.options == options_digest
+                and exists(object_file)
+            ):
+                with lock:
+                    count_increment("cache:hit")
+                    local_cache[object_file] = new_cache_entry
+                return resolved, False, None
+
+            cached_object_file = (
+                conf.get_cached_object_path(hashlib.sha256(source_hash_digest + options_digest).hexdigest())
+                if use_shared_cache
+                else None
+            )
 
-            source_hash_digest = source_hash.digest()
+            if cached_object_file is not None and exists(cached_object_file):
+                shutil.copyfile(cached_object_file, object_file)
+                with lock:
+                    count_increment("cache:shared_hit")
+                    local_cache[object_file] = new_cache_entry
+                return resolved, True, None
+
+            with lock:
+                count_increment("cache:miss")
+
+            return resolved, True, (options_digest, new_cache_entry, cached_object_file)
+
+        def compute_source_digest(
+            source_file: str,
+            include_files: list[str],
+            language_standard: msvc.LanguageStandard,
+        ) -> bytes:
+            # NOTE(gr3yknigh1): Files are hashed right in the threads which check the sources. Reading and
+            # hashing release the GIL, so they run in parallel without worker processes. [2025/06/18]
+            salt = language_standard.value.encode("utf-8") + bytes(int(optimization_level.value))
+
+            return compute_translation_unit_digest(
+                get_file_digest(source_file),
+                [get_file_digest(include_file) for include_file in include_files],
+                salt=salt,
+            )
 
-            cached_object_file_source_hash_digest = local_cache.get(object_file, None)
+        def compile_group(
+            language_standard: msvc.LanguageStandard,
+            group: list[tuple[ResolvedSource, bytes, ObjectCacheEntry | None, str | None]],
+        ) -> int:
+            """Compiles translation units which share the same flags with single `cl.exe` invocation.
+
+            Sources with unique object names are compiled one by one. Returns exit code of the compiler.
+            """
+
+            # NOTE(gr3yknigh1): `cl.exe` names objects after sources when `/Fo` points to the folder,
+            # which matches `ResolvedSource.object_file`. [2025/06/18]
+            batch = [entry for entry in group if not entry[0].unique_object_name]
+            invocations: list[tuple[list[tuple[ResolvedSource, bytes, ObjectCacheEntry | None, str | None]], dict[str, Any]]] = []
+
+            if len(batch) > 0:
+                invocations.append((batch, dict(
+                    response_file=join(target_output_native_prefix, f"compile.{language_standard!s}.rsp"),
+                    source_dependencies=source_dependencies_folder,
+                )))
+
+            for entry in group:
+                if entry[0].unique_object_name:
+                    invocations.append(([entry], dict(
+                        output_dir=None,
+                        output=to_native_path(entry[0].object_file),
+                        source_dependencies=get_source_dependencies_file(entry[0]),
+                    )))
+
+            return_code = 0
+
+            for entries, options in invocations:
+                # NOTE(gr3yknigh1): `/MP` makes `cl.exe` compile sources of the group in parallel by itself. It
+                # gets only slots which other targets don't use right now, and it is no-op for single source,
+                # so it is passed only when it matters. [2025/06/18]
+                slots = job_slots.acquire(len(entries) if conf.multi_process_compilation else 1)
+
+                try:
+                    with mesure_time(f"{timer_prefix}.{language_standard!s}:msvc_compile"):
+                        result = compile_objects(
+                            [resolved.native_path for resolved, *_ in entries],
+                            language_standard=language_standard,
+                            mp_processes=slots if slots > 1 else None,
+                            **options,
+                        )
+                finally:
+                    job_slots.release(slots)
 
-            if cached_object_file_source_hash_digest is not None and cached_object_file_source_hash_digest == source_hash_digest:
-                reporter.count_increment("cache:hit")
-            else:
-                reporter.count_increment("cache:miss")
-
-                with reporter.mesure_time(f"compile:{package.name}.{target.name}.{source_file_name}:msvc_compile"):
-                    result = msvc.compile(
-                        c,
-                        [source_path],
-                        output=object_file,
-                        only_compilation=True,
-                        produce_pdb=is_debug,
-                        includes=includes,
-                        defines=macros,
-                        output_kind=msvc.OutputKind.OBJECT_FILE,
-                        exception_handle=msvc.ExceptionHandle.HANDLE_CXX_SEH,
-                        optimization_level=optimization_level,
-                        language_standard=language_standard,
-                        debug_info_mode=debug_info_mode,
-                        runtime_library=runtime_library,
-                        env=conf.environment,
+                if result.return_code != 0:
+                    return_code = return_code or result.return_code
+                    continue
+
+                update_caches(language_standard, entries)
+
+            return return_code
+
+        def update_caches(
+            language_standard: msvc.LanguageStandard,
+            entries: list[tuple[ResolvedSource, bytes, ObjectCacheEntry | None, str | None]],
+        ) -> None:
+            for resolved, options_digest, new_cache_entry, cached_object_file in entries:
+                if new_cache_entry is None:
+                    include_files = msvc.read_source_dependencies(get_source_dependencies_file(resolved))
+                    conf.set_include_files(resolved.path, options_digest, include_files)
+
+                    new_cache_entry = ObjectCacheEntry(
+                        digest=compute_source_digest(resolved.path, include_files, language_standard),
+                        options=options_digest,
+                        dependencies=[resolved.path, *include_files],
                     )
 
-                if result.return_code != 0:
-                    raise Exception(
-                        f"Failed to compile! return_code={result.return_code!r}."
+                if cached_object_file is not None:
+                    store_file(resolved.object_file, cached_object_file)
+
+                with lock:
+                    local_cache[resolved.object_file] = new_cache_entry
+
+        def get_source_dependencies_file(resolved: ResolvedSource) -> str:
+            # NOTE(gr3yknigh1): When `/sourceDependencies` points to the folder, `cl.exe` names files after
+            # sources. Sources with unique object names are compiled alone and name it by the object. [2025/06/18]
+            if resolved.unique_object_name:
+                return join(source_dependencies_folder, f"{basename(resolved.object_file)}.json")
+            return join(source_dependencies_folder, f"{resolved.file_name}.json")
+
+        local_cache = conf.get_local_cache()
+        lock = conf.get_local_cache_lock()
+        job_slots = conf.get_job_slots()
+        get_file_digest = conf.get_file_digest
+
+        target_output_native_prefix = to_native_path(target_output_prefix)
+        source_dependencies_folder = join(target_output_native_prefix, "deps")
+        _ensure_dir(source_dependencies_folder)
+
+        # NOTE(gr3yknigh1): With `/Zi` debug information lives in separate PDB file of the target,
+        # so only objects of non-debug builds are shared. [2025/06/18]
+        use_shared_cache = not is_debug and conf.object_cache_folder is not None
+
+        # NOTE(gr3yknigh1): Everything except sources and language standard is the same for each translation
+        # unit of the target, so compiler calls are specialized once here. [2025/06/18]
+        show_includes_many = partial(
+            msvc.show_includes_many,
+            c,
+            includes=includes,
+            macros=macros,
+            exception_handle=exception_handle,
+            env=compiler_environment_block,
+            inherit_env=False,
+            quiet=True,
+        )
+        # NOTE(gr3yknigh1): Without `/Fd` every `cl.exe` writes `vc*.pdb` into working directory, which is
+        # shared by all targets compiled in parallel. Each target gets PDB in it's own folder. [2025/06/18]
+        compile_objects = partial(
+            msvc.compile,
+            c,
+            output_dir=target_output_native_prefix,
+            output_debug_info_path=f"{target_output_native_prefix}\\" if is_debug else None,
+            only_compilation=True,
+            produce_pdb=is_debug,
+            includes=includes,
+            defines=macros,
+            output_kind=msvc.OutputKind.OBJECT_FILE,
+            exception_handle=exception_handle,
+            optimization_level=optimization_level,
+            debug_info_mode=debug_info_mode,
+            runtime_library=runtime_library,
+            env=compiler_environment_block,
+            inherit_env=False,
+        )
+
+        # NOTE(gr3yknigh1): Sources which were never scanned are scanned with one `cl.exe` invocation per
+        # language standard instead of one per source. [2025/06/18]
+        if use_shared_cache:
+            unscanned_groups: dict[msvc.LanguageStandard, list[ResolvedSource]] = {}
+
+            for resolved in sources:
+                language_standard = get_language_standard(resolved)
+                if conf.get_include_files(resolved.path, get_options_digest(language_standard)) is None:
+                    unscanned_groups.setdefault(language_standard, []).append(resolved)
+
+            for language_standard, group in unscanned_groups.items():
+                options_digest = get_options_digest(language_standard)
+
+                with mesure_time(f"{timer_prefix}.{language_standard!s}:show_includes"):
+                    scanned = show_includes_many(
+                        [resolved.native_path for resolved in group], language_standard=language_standard
                     )
 
-                local_cache[object_file] = source_hash_digest
+                for resolved in group:
+                    conf.set_include_files(resolved.path, options_digest, scanned[resolved.native_path])
 
-            object_files.append(object_file)
+        pending_groups: dict[msvc.LanguageStandard, list[tuple[ResolvedSource, bytes, ObjectCacheEntry | None, str | None]]] = {}
 
-        with reporter.mesure_time(f"compile:{package.name}.{target.name}:msvc_link"):
+        with mesure_time(f"{timer_prefix}:prefetch_digests"):
+            conf.prefetch_file_digests([resolved.path for resolved in sources])
+
+        with ThreadPoolExecutor(max_workers=max(1, min(len(sources), os.cpu_count() or 1))) as executor:
+            for resolved, is_recompiled, pending in executor.map(check_source, sources):
+                object_files.append(resolved.object_file)
+                has_recompiled_objects = has_recompiled_objects or is_recompiled
+
+                if pending is not None:
+                    pending_groups.setdefault(get_language_standard(resolved), []).append((resolved, *pending))
+
+            # NOTE(gr3yknigh1): Groups of sources, not single sources, are the parallel unit here. Every group
+            # is finished before failures are reported, so errors of all of them are visible. [2025/06/18]
+            return_codes = list(executor.map(compile_group, pending_groups.keys(), pending_groups.values()))
+
+        failed_groups = {
+            str(language_standard): return_code
+            for language_standard, return_code in zip(pending_groups.keys(), return_codes)
+            if return_code != 0
+        }
+
+        if len(failed_groups) > 0:
+            raise Exception(
+                f"Failed to compile! failed_groups={failed_groups!r}."
+            )
+
+        # NOTE(gr3yknigh1): Link key covers the things timestamps can't see: set of linked libraries, kind of
+        # the target and the compiler options. [2025/06/18]
+        link_hash = options_hash.copy()
+        link_hash.update(repr((target.kind, object_files, libraries)).encode("utf-8"))
+
+        with lock:
+            for object_file in object_files:
+                object_cache_entry = local_cache.get(object_file, None)
+                if isinstance(object_cache_entry, ObjectCacheEntry):
+                    link_hash.update(object_cache_entry.digest)
+            link_cache_entry = local_cache.get(output, None)
+
+        link_digest = link_hash.digest()
+        link_dependencies = [*object_files, *link_artefacts]
+
+        if (
+            not has_recompiled_objects
+            and isinstance(link_cache_entry, ObjectCacheEntry)
+            and link_cache_entry.digest == link_digest
+            and is_up_to_date(output, link_dependencies)
+        ):
+            with lock:
+                count_increment("link:skip")
+                conf._artefacts.append(output)
+            target.state = TargetState.ALREADY_COMPILED
+            return public_props
+
+        with mesure_time(f"{timer_prefix}:msvc_link"):
             if target.kind == TargetKind.EXECUTABLE:
                 result = msvc.compile(
                     c,
@@ -709,27 +1642,30 @@ def compile_target(c: Context, *, conf: Configuration, package: Package, target:
                     produce_pdb=is_debug,
                     debug_info_mode=debug_info_mode,
                     libs=[*object_files, *libraries],
-                    env=conf.environment,
+                    env=environment_block,
+                    inherit_env=False,
                 )
             elif target.kind == TargetKind.STATIC_LIBRARY:
                 result = msvc.link(
                     c,
                     object_files,
-                    output=target.get_artefact_path(conf),
+                    output=output,
                     output_kind=msvc.OutputKind.STATIC_LIBRARY,
-                    env=conf.environment,
+                    env=environment_block,
+                    kw=dict(inherit_env=False),
                 )
             elif target.kind == TargetKind.DYNAMIC_LIBRARY:
                 result = msvc.compile(
                     c,
                     object_files,
-                    output=target.get_artefact_path(conf),
+                    output=output,
                     output_kind=msvc.OutputKind.DYNAMIC_LIBRARY,
                     output_debug_info_path=f"{output_filename}.pdb",
                     debug_info_mode=debug_info_mode,
                     produce_pdb=is_debug,
                     libs=libraries,
-                    env=conf.environment,
+                    env=environment_block,
+                    inherit_env=False,
                     is_dll=True,
                 )
             else:
@@ -739,6 +1675,14 @@ def compile_target(c: Context, *, conf: Configuration, package: Package, target:
             raise Exception(
                 f"Failed to compile! return_code={result.return_code!r}"
             )
+
+        with lock:
+            local_cache[output] = ObjectCacheEntry(
+                digest=link_digest,
+                options=options_hash.digest(),
+                dependencies=link_dependencies,
+            )
+            conf._artefacts.append(output)
     else:
         raise NotImplementedError("Sorry. We are supporting only MSVC for now...")
 
@@ -747,6 +1691,222 @@ def compile_target(c: Context, *, conf: Configuration, package: Package, target:
     return public_props
 
 
+def get_chain_depths(keys: Iterable[int], dependents: dict[int, list[int]]) -> dict[int, int]:
+    """Computes length of the longest chain of dependents for every target (target itself included).
+
+    Targets which are part of circular dependency are left out.
+    """
+
+    keys = list(keys)
+    unprocessed_dependents = {key: len(dependents.get(key, [])) for key in keys}
+    links: dict[int, list[int]] = {}
+
+    for key in keys:
+        for dependent in dependents.get(key, []):
+            links.setdefault(dependent, []).append(key)
+
+    depths: dict[int, int] = {}
+    stack = [key for key, count in unprocessed_dependents.items() if count == 0]
+
+    while len(stack) > 0:
+        key = stack.pop()
+        depths[key] = 1 + max((depths[dependent] for dependent in dependents.get(key, [])), default=0)
+
+        for link in links.get(key, []):
+            unprocessed_dependents[link] -= 1
+            if unprocessed_dependents[link] == 0:
+                stack.append(link)
+
+    return depths
+
+
+def compile_targets(
+    c: Context,
+    *,
+    conf: Configuration,
+    roots: list[tuple[Target, Package]],
+    reporter: Reporter,
+) -> dict[int, TargetProperties]:
+    """ Compiles the root targets and all their dependencies.
+
+    Target is scheduled as soon as all targets it links with are compiled, so independent
+    targets are compiled in parallel.
+
+    :returns: Public properties of every compiled target, keyed by `id` of target.
+    """
+
+    targets: dict[int, Target] = {}
+    targets_by_name: dict[str, Target] = {}
+    owners: dict[int, Package] = {}
+    target_links: dict[int, list[int]] = {}
+
+    # NOTE(gr3yknigh1): Targets compiled by previous calls with the same configuration are not compiled
+    # again. [2025/06/18]
+    memo = conf.get_compiled_targets()
+    compiled: dict[int, TargetProperties] = {}
+
+    stack = list(roots)
+    while len(stack) > 0:
+        target, package = stack.pop()
+        key = id(target)
+
+        if key in targets or key in compiled:
+            continue
+
+        if key in memo:
+            compiled[key] = memo[key]
+            continue
+
+        # NOTE(gr3yknigh1): Targets with the same name would share output folder and artefacts. [2025/06/18]
+        same_name_target = targets_by_name.get(target.name, None)
+        if same_name_target is not None:
+            raise Exception(f"Found target with the same name! new={target.name!r} old={same_name_target.name!r}")
+
+        targets[key] = target
+        targets_by_name[target.name] = target
+        owners[key] = package
+
+        links = {id(link): link for link in get_target_links(target)}
+        target_links[key] = list(links.keys())
+
+        for link in links.values():
+            stack.append((link, package))
+
+    pending_links: dict[int, int] = {}
+    dependents: dict[int, list[int]] = {}
+
+    for key, links in target_links.items():
+        pending_links[key] = 0
+
+        for link_key in links:
+            if link_key in compiled:
+                continue
+            pending_links[key] += 1
+            dependents.setdefault(link_key, []).append(key)
+
+    def compile_one(key: int) -> tuple[int, TargetProperties]:
+        target, package = targets[key], owners[key]
+
+        with reporter.mesure_time(f"compile:{package.name}.{target.name}"):
+            properties = _compile_single_target(c, conf=conf, package=package, target=target, reporter=reporter, compiled=compiled)
+
+        return key, properties
+
+    # NOTE(gr3yknigh1): Ready targets are started by the length of the longest chain of targets which wait for
+    # them (and then by number of direct dependents), so long chains are not queued behind leaves. [2025/06/18]
+    chain_depth = get_chain_depths(target_links.keys(), dependents)
+
+    def get_priority(key: int) -> tuple[int, int, int]:
+        return -chain_depth.get(key, 1), -len(dependents.get(key, [])), key
+
+    ready = [get_priority(key) for key, count in pending_links.items() if count == 0]
+    heapq.heapify(ready)
+
+    max_workers = os.cpu_count() or 1
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running: set[Future] = set()
+
+        while len(ready) > 0 or len(running) > 0:
+            while len(ready) > 0 and len(running) < max_workers:
+                *_, key = heapq.heappop(ready)
+                running.add(executor.submit(compile_one, key))
+
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                key, properties = future.result()
+                compiled[key] = properties
+                memo[key] = properties
+
+                for dependent in dependents.get(key, []):
+                    pending_links[dependent] -= 1
+                    if pending_links[dependent] == 0:
+                        heapq.heappush(ready, get_priority(dependent))
+
+    if any(key not in compiled for key in targets.keys()):
+        not_compiled = [target.name for key, target in targets.items() if key not in compiled]
+        raise Exception(f"Found circular dependency between targets! targets={not_compiled!r}")
+
+    return compiled
+
+
+HBUILD_BUILD_FILE_MODULE_PREFIX = "__hbuild_build_file__"
+
+
+def load_build_file(build_file: str) -> list[Package]:
+    """ Executes build file and returns packages, which it defines.
+
+    Executed module is kept in `sys.modules` (keyed by path and modification time of the file),
+    so loading the same unchanged build file again doesn't execute it twice.
+    """
+
+    build_file = os.path.abspath(build_file)
+    module_name_prefix = f"{HBUILD_BUILD_FILE_MODULE_PREFIX}::{build_file}::"
+    module_name = f"{module_name_prefix}{os.stat(build_file).st_mtime_ns}"
+
+    module = sys.modules.get(module_name, None)
+
+    if module is None:
+        module_spec = importlib.util.spec_from_file_location(
+            module_name, build_file
+        )
+
+        if module_spec is None:
+            raise NotImplementedError()
+
+        module = importlib.util.module_from_spec(module_spec)
+        setattr(module, HBUILD_MAGIC_PACKAGE_LIST_ATTR_NAME, [])
+
+        if module_spec.loader is None:
+            raise NotImplementedError()
+
+        token = _current_packages.set(getattr(module, HBUILD_MAGIC_PACKAGE_LIST_ATTR_NAME))
+        try:
+            module_spec.loader.exec_module(module)
+        finally:
+            _current_packages.reset(token)
+
+        # NOTE(gr3yknigh1): Forget modules of previous versions of the build file. [2025/06/18]
+        for stale_module_name in [name for name in sys.modules if name.startswith(module_name_prefix)]:
+            del sys.modules[stale_module_name]
+
+        sys.modules[module_name] = module
+
+    packages: list[Package] | None = getattr(module, HBUILD_MAGIC_PACKAGE_LIST_ATTR_NAME, None)
+    assert packages is not None
+
+    return packages
+
+
+def get_source_tree_hash(c: Context, folder: str) -> str | None:
+    """Returns hash of git tree of `folder` at `HEAD` if it has no uncommitted changes.
+
+    Returns `None` if `folder` is not in git repository or git isn't available.
+    """
+
+    try:
+        # NOTE(gr3yknigh1): `HEAD:./` is tree of the folder itself, not of the root of repository. It is used
+        # instead of `HEAD^{tree}`, because `^` is escape character of `cmd.exe`. [2025/06/18]
+        result = c.run(f"git -C {c.quote(folder)} rev-parse HEAD:./", capture_output=True, quiet=True)
+
+        if result.return_code != 0 or not result.output:
+            return None
+
+        tree = result.output.strip()
+
+        # NOTE(gr3yknigh1): Untracked files (which are not ignored) are counted as changes, because build file
+        # may refer to them. [2025/06/18]
+        result = c.run(f"git -C {c.quote(folder)} status --porcelain -- .", capture_output=True, quiet=True)
+    except OSError:
+        return None
+
+    if result.return_code != 0 or result.output is None or len(result.output.strip()) > 0:
+        return None
+
+    return tree
+
+
 def compile_project(
     c: Context,
     *,
@@ -756,30 +1916,19 @@ def compile_project(
     build_type=BuildType.DEBUG,
     architecture=Architecture.X86_64,
     reporter: Reporter | None = None,
+    reconfigure=False,
+    use_tree_cache=False,
 ) -> TargetProperties:
+    """Builds every target of the build file.
+
+    :param use_tree_cache: Return properties of the previous build right away if the project folder is
+        committed git tree which was already built with the same configuration. Costs two `git` processes.
+    """
 
     if reporter is None:
         reporter = NullReporter()
 
-    filename = basename(build_file)
-
-    module_spec = importlib.util.spec_from_file_location(
-        filename, build_file
-    )
-
-    if module_spec is None:
-        raise NotImplementedError()
-
-    module = importlib.util.module_from_spec(module_spec)
-    setattr(module, HBUILD_MAGIC_PACKAGE_LIST_ATTR_NAME, [])
-
-    if module_spec.loader is None:
-        raise NotImplementedError()
-
-    module_spec.loader.exec_module(module)
-
-    packages: list[Package] | None = getattr(module, HBUILD_MAGIC_PACKAGE_LIST_ATTR_NAME, None)
-    assert packages is not None
+    packages = load_build_file(build_file)
 
     if len(packages) <= 0:
         raise Exception("No packages was found! Use `add_package` in order to wrap targets in compilable project.")
@@ -794,21 +1943,48 @@ def compile_project(
         build_type=build_type,
         architecture=architecture,
         prefix=prefix,
+        reconfigure=reconfigure,
     )
 
-    cache_file = join(conf.get_output_folder(), "cache.pickle")
+    cache_file = join(conf.get_output_folder(), "cache.db")
+    file_cache_file = join(conf.get_output_folder(), "files.pickle")
+
+    # NOTE(gr3yknigh1): Build of the same committed tree with the same configuration gives the same
+    # artefacts, so none of the targets are visited. [2025/06/18]
+    tree = get_source_tree_hash(c, conf.get_project_folder()) if use_tree_cache and not reconfigure else None
+
+    if tree is not None:
+        with reporter.mesure_time("cache:tree"):
+            cached_properties = conf.load_tree_cache(cache_file, tree)
+
+        if cached_properties is not None:
+            reporter.count_increment("tree:hit")
+            return cached_properties
 
     with reporter.mesure_time("cache:load"):
         conf.load_local_cache(cache_file)
+        conf.load_file_cache(file_cache_file)
+
+    # NOTE(gr3yknigh1): Cache is saved even if build fails, so objects compiled before the failure are not
+    # compiled again. [2025/06/18]
+    try:
+        compiled = compile_targets(
+            c,
+            conf=conf,
+            roots=[(target, package) for package in packages for target in package.targets],
+            reporter=reporter,
+        )
+    finally:
+        with reporter.mesure_time("cache:save"):
+            conf.save_local_cache(cache_file)
+            conf.save_file_cache(file_cache_file)
 
     for package in packages:
         for target in package.targets:
-            with reporter.mesure_time(f"compile:{package.name}.{target.name}"):
-                target_properties = compile_target(c, conf=conf, package=package, target=target, reporter=reporter)
-            properties = properties.merge(target_properties)
+            properties.extend_from(compiled[id(target)])
 
-    with reporter.mesure_time("cache:save"):
-        conf.save_local_cache(cache_file)
+    if tree is not None:
+        conf.save_tree_cache(cache_file, tree, properties)
 
     return properties
 
@@ -906,3 +2082,14 @@ def save_env(file: str, env: dict[str, Any]) -> None:
     with open(file, mode="w") as f:
         for k, v in env.items():
             f.write(f"{k}={v}\n")
+
+def is_env_cache_fresh(file: str, bootstrap: str | None) -> bool:
+    """Checks that cached environment is newer than the script which produced it."""
+
+    if not exists(file):
+        return False
+
+    if bootstrap is None:
+        return True
+
+    return getmtime(bootstrap) <= getmtime(file)
@@ -5,9 +5,6 @@ import argparse
 import sys
 import os
 
-from htask import Context
-
-from hbuild import compile_project
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -23,6 +20,12 @@ def main(argv: list[str] | None = None) -> int:
     )
     parser.add_argument("-e", dest="echo", type=bool, default=True)
     parser.add_argument("-n", "--dry-run", dest="dry_run", default=False)
+    parser.add_argument(
+        "--reconfigure", dest="reconfigure", action="store_true", default=False
+    )
+    parser.add_argument(
+        "--tree-cache", dest="use_tree_cache", action="store_true", default=False
+    )
 
     args = parser.parse_args(argv)
     working_dir = getattr(args, "working_dir", None)
@@ -39,9 +42,21 @@ def main(argv: list[str] | None = None) -> int:
     echo = getattr(args, "echo", None)
     assert echo is not None
 
+    reconfigure = getattr(args, "reconfigure", False)
+    use_tree_cache = getattr(args, "use_tree_cache", False)
+
+    # NOTE(gr3yknigh1): Imported after arguments are parsed, so `--help` and usage errors do not pay for
+    # it. [2025/06/18]
+    from htask import Context
+    from hbuild import compile_project
+
     c = Context(root=working_dir)
     compile_project(
-        c, build_file=build_file, prefix=join(working_dir, "build")
+        c,
+        build_file=build_file,
+        prefix=join(working_dir, "build"),
+        reconfigure=reconfigure,
+        use_tree_cache=use_tree_cache,
     )
 
     return 0
@@ -1,10 +1,15 @@
-from hpipe.pipeline import Pipeline
-from hpipe.pipeline import Job
-from hpipe.pipeline import Context
-from hpipe.pipeline import define_job
+import importlib
 
 __version__ = "0.0.1"
 __version_info__ = __version__.split(".")
 
 
 __all__ = ("Pipeline", "Job", "define_job")
+
+
+def __getattr__(name: str):
+    # NOTE(gr3yknigh1): `hpipe.pipeline` is imported on first use, so running `python -m hpipe help` doesn't
+    # import it. [2025/06/18]
+    if name in ("Pipeline", "Job", "Context", "define_job"):
+        return getattr(importlib.import_module("hpipe.pipeline"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,18 +1,24 @@
+from __future__ import annotations
 from typing import Any
 from typing import Optional
+from typing import Dict
+from typing import Tuple
+from typing import TYPE_CHECKING
 
 from argparse import ArgumentParser
 from dataclasses import dataclass
-import importlib
-import importlib.util
+from types import ModuleType
 import sys
 import os
 import os.path
 import logging
 
-from hpipe.pipeline import Pipeline
-from hpipe.pipeline import execute_pipeline
-from hpipe.pipeline import orphan_pipeline
+# NOTE(gr3yknigh1): Pipeline machinery is imported by handlers which need it, so `help` doesn't pay for
+# it. [2025/06/18]
+if TYPE_CHECKING:
+    from hpipe.pipeline import Pipeline
+
+logger = logging.getLogger("hpipe")
 
 PIPELINE_ROOT_MODULE_NAME = "__hpipe_root_pipeline__"
 
@@ -24,10 +30,8 @@ DEFAULT_PIPELINE_FILE = "pipeline.py"
 class _PathNotExists(Exception):
     path: str
 
-    def __post_init__(self):
-        super().__init__(
-            f"Path doesn't exists: {self.path!r}",
-        )
+    def __str__(self) -> str:
+        return f"Path doesn't exists: {self.path!r}"
 
 
 @dataclass
@@ -35,14 +39,84 @@ class _PipelineInstanceNotFound(Exception):
     instance_var: str
     pipeline_path: str
 
-    def __post_init__(self):
-        super().__init__(
-            f"Failed to find pipeline instance in module[{self.pipeline_path!r}]: {self.instance_var!r}",
-        )
+    def __str__(self) -> str:
+        return f"Failed to find pipeline instance in module[{self.pipeline_path!r}]: {self.instance_var!r}"
+
+
+# NOTE(gr3yknigh1): (path, mtime in ns) -> module. Lets `execute_file` reuse already executed pipeline file.
+# [2025/06/18]
+_loaded_pipeline_modules: Dict[Tuple[str, int], ModuleType] = {}
+
+
+def _load_pipeline_module(pipeline_file_path: str, mtime_ns: int) -> ModuleType:
+    key = (pipeline_file_path, mtime_ns)
+    pipeline_module = _loaded_pipeline_modules.get(key, None)
+
+    if pipeline_module is not None:
+        return pipeline_module
+
+    from importlib.machinery import SourceFileLoader
+    import importlib.util
+
+    # NOTE(gr3yknigh1): `SourceFileLoader` reads and writes bytecode in `__pycache__`, so pipeline file is
+    # compiled only after it changes. [2025/06/18]
+    loader = SourceFileLoader(PIPELINE_ROOT_MODULE_NAME, pipeline_file_path)
+    pipeline_module_spec = importlib.util.spec_from_file_location(
+        PIPELINE_ROOT_MODULE_NAME, pipeline_file_path, loader=loader
+    )
+
+    if pipeline_module_spec is None:
+        raise NotImplementedError()
+
+    pipeline_module = importlib.util.module_from_spec(pipeline_module_spec)
+
+    # NOTE(gr3yknigh1): Module is registered only while it is executed, so it doesn't leak between
+    # `execute_file` calls. [2025/06/18]
+    sys.modules[PIPELINE_ROOT_MODULE_NAME] = pipeline_module
+    try:
+        loader.exec_module(pipeline_module)
+    finally:
+        sys.modules.pop(PIPELINE_ROOT_MODULE_NAME, None)
+
+    _loaded_pipeline_modules[key] = pipeline_module
+    return pipeline_module
 
 
-def execute_file(file=DEFAULT_PIPELINE_FILE, var=DEFAULT_PIPELINE_VAR):
-    ...
+def _resolve_pipeline(pipeline_module: ModuleType, pipeline_var: str) -> Optional[Pipeline]:
+    from hpipe.pipeline import orphan_pipeline
+
+    pipeline_instance: Optional[Pipeline] = getattr(pipeline_module, pipeline_var, None)
+
+    if pipeline_instance is None and len(orphan_pipeline.jobs) > 0:
+        return orphan_pipeline
+
+    return pipeline_instance
+
+
+def _load_pipeline(pipeline_file_path: str, pipeline_var: str) -> Pipeline:
+    # NOTE(gr3yknigh1): Single `stat` both checks the file and gives key for loaded modules. [2025/06/18]
+    try:
+        stat = os.stat(pipeline_file_path)
+    except FileNotFoundError:
+        raise _PathNotExists(pipeline_file_path)
+
+    pipeline_module = _load_pipeline_module(pipeline_file_path, stat.st_mtime_ns)
+
+    logger.debug(f"pipeline_module={pipeline_module!r}")
+    pipeline_instance = _resolve_pipeline(pipeline_module, pipeline_var)
+
+    if pipeline_instance is None:
+        raise _PipelineInstanceNotFound(pipeline_var, pipeline_file_path)
+
+    logger.debug(f"pipeline_instance={pipeline_instance!r}")
+    return pipeline_instance
+
+
+def execute_file(file=DEFAULT_PIPELINE_FILE, var=DEFAULT_PIPELINE_VAR, *, dry_run=False):
+    from hpipe.pipeline import execute_pipeline
+
+    pipeline_file_path = os.path.join(os.getcwd(), file)
+    execute_pipeline(_load_pipeline(pipeline_file_path, var), dry_run=dry_run)
 
 
 def _handler_help(parser: ArgumentParser, args: Any):
@@ -54,51 +128,50 @@ def _handler_help(parser: ArgumentParser, args: Any):
 def _handler_run(parser: ArgumentParser, args: Any):
     _ = parser
 
-    logger = logging.getLogger("hpipe")
+    from hpipe.pipeline import execute_pipeline
 
     pipeline_file: str = args.pipeline_file
     pipeline_var: str = args.pipeline_var
     dry_run: bool = args.dry_run
 
     pipeline_file_path = os.path.join(os.getcwd(), pipeline_file)
+    pipeline_instance = _load_pipeline(pipeline_file_path, pipeline_var)
 
-    if not os.path.exists(pipeline_file_path):
-        raise _PathNotExists(pipeline_file_path)
-
-    pipeline_module_spec = importlib.util.spec_from_file_location(
-        PIPELINE_ROOT_MODULE_NAME, pipeline_file_path
-    )
-
-    if pipeline_module_spec is None:
-        raise NotImplementedError()
-
-    pipeline_module = importlib.util.module_from_spec(pipeline_module_spec)
-
-    if pipeline_module_spec.loader is None:
-        raise NotImplementedError()
+    execute_pipeline(pipeline_instance, dry_run=dry_run)
 
-    sys.modules[PIPELINE_ROOT_MODULE_NAME] = pipeline_module
-    pipeline_module_spec.loader.exec_module(pipeline_module)
 
-    logger.debug(f"pipeline_module={pipeline_module!r}")
-    pipeline_instance: Optional[Pipeline] = getattr(
-        pipeline_module, pipeline_var, None
+def _add_run_arguments(run_parser: ArgumentParser):
+    run_parser.set_defaults(handler=_handler_run)
+    run_parser.add_argument(
+        "-p", "--pipeline-file", default="pipeline.py", dest="pipeline_file"
+    )
+    run_parser.add_argument(
+        "--pipeline-var", default="pipeline", dest="pipeline_var"
+    )
+    run_parser.add_argument(
+        "-n", "--dry-run", default=False, dest="dry_run", action="store_true"
     )
-    
-    if pipeline_instance is None and len(orphan_pipeline.jobs) > 0:
-        pipeline_instance = orphan_pipeline 
 
-    if pipeline_instance is None:
-        raise _PipelineInstanceNotFound(pipeline_var, pipeline_file_path)
 
-    logger.debug(f"pipeline_instance={pipeline_instance!r}")
+def _fast_run(argv: list[str]) -> int:
+    run_parser = ArgumentParser(prog="hpipe run")
+    _add_run_arguments(run_parser)
 
-    execute_pipeline(pipeline_instance, dry_run=dry_run)
+    args = run_parser.parse_args(argv)
+    _handler_run(run_parser, args)
+
+    return 0
 
 
 def main() -> int:
-    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
-    logger = logging.getLogger("hpipe")
+    # NOTE(gr3yknigh1): Logging is configured by CLI entry point (script or `python -m`), and not when
+    # `execute_file` is imported from this module. [2025/06/18]
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"))
+
+    # NOTE(gr3yknigh1): `run` without global options is the common case, so only its parser is built for
+    # it. [2025/06/18]
+    if len(sys.argv) > 1 and sys.argv[1] == "run":
+        return _fast_run(sys.argv[2:])
 
     parser = ArgumentParser()
     parser.set_defaults(handler=_handler_help)
@@ -112,16 +185,7 @@ def main() -> int:
     help_parser.set_defaults(handler=_handler_help)
 
     run_parser = subparsers.add_parser("run")
-    run_parser.set_defaults(handler=_handler_run)
-    run_parser.add_argument(
-        "-p", "--pipeline-file", default="pipeline.py", dest="pipeline_file"
-    )
-    run_parser.add_argument(
-        "--pipeline-var", default="pipeline", dest="pipeline_var"
-    )
-    run_parser.add_argument(
-        "-n", "--dry-run", default=False, dest="dry_run", action="store_true"
-    )
+    _add_run_arguments(run_parser)
 
     args = parser.parse_args()
 
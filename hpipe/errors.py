@@ -8,7 +8,7 @@ from dataclasses import dataclass
 if TYPE_CHECKING:
     from hpipe.pipeline import Job
 
-__all__ = ("JobFailed", "StageIsNotDefined", "StagesAreAlreadyDefined")
+__all__ = ("JobFailed", "StageIsNotDefined", "StagesAreAlreadyDefined", "CircularDependency", "PipelineFailed")
 
 
 class JobFailed(Exception): ...
@@ -19,19 +19,15 @@ class JobRequiredCommandNotFound(Exception):
     missing: Sequence[str]
     required: Sequence[str]
 
-    def __post_init__(self):
-        super().__init__(
-            f"Missing commands: {self.missing}. Required: {self.required}."
-        )
+    def __str__(self) -> str:
+        return f"Missing commands: {self.missing}. Required: {self.required}."
 
 @dataclass
 class PipelineMissingRequiredPrograms(Exception):
     missing: dict[Job, list[str]]
     
-    def __post_init__(self):
-        super().__init__(
-            f"Missing commands: {self.missing}"
-        )
+    def __str__(self) -> str:
+        return f"Missing commands: {self.missing}"
 
 
 @dataclass
@@ -39,10 +35,8 @@ class JobCommandFailed(Exception):
     command: str
     returncode: int
 
-    def __post_init__(self):
-        super().__init__(
-            f"{self.command!r} command failed and exited with {self.returncode} return code"
-        )
+    def __str__(self) -> str:
+        return f"{self.command!r} command failed and exited with {self.returncode} return code"
 
 
 @dataclass
@@ -50,10 +44,8 @@ class StageIsNotDefined(Exception):
     job: Job
     defined_stages: Sequence[str]
 
-    def __post_init__(self):
-        super().__init__(
-            f"Stage doesn't defined: {self.job.stage!r}, stages={self.defined_stages!r}. Referenced from job={self.job!r}"
-        )
+    def __str__(self) -> str:
+        return f"Stage doesn't defined: {self.job.stage!r}, stages={self.defined_stages!r}. Referenced from job={self.job!r}"
 
 
 # @dataclass
@@ -72,7 +64,22 @@ class StagesAreAlreadyDefined(Exception):
     duplacated_stages: Set[str]
     defined_stages: Sequence[str]
 
-    def __post_init__(self):
-        super().__init__(
-            f"Stages is already defined: {self.duplacated_stages!r}, stages={self.defined_stages!r}"
-        )
+    def __str__(self) -> str:
+        return f"Stages is already defined: {self.duplacated_stages!r}, stages={self.defined_stages!r}"
+
+
+@dataclass
+class CircularDependency(Exception):
+    jobs: Sequence[Job]
+
+    def __str__(self) -> str:
+        return f"Found circular dependency between jobs: {self.jobs!r}"
+
+
+@dataclass
+class PipelineFailed(Exception):
+    failed_jobs: Sequence[Job]
+    skipped_jobs: Sequence[Job]
+
+    def __str__(self) -> str:
+        return f"Jobs failed: {self.failed_jobs!r}. Jobs skipped because of it: {self.skipped_jobs!r}"
@@ -5,16 +5,26 @@ from typing import Set
 from typing import Optional
 from typing import Sequence
 from typing import Dict
+from typing import Tuple
 
-from collections import Counter
-from collections import OrderedDict
 from dataclasses import dataclass
 from dataclasses import field
 from logging import getLogger
 from functools import partial
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future
+from concurrent.futures import wait
+from concurrent.futures import FIRST_COMPLETED
+from operator import itemgetter
+from bisect import bisect_left
+from array import array
+import heapq
 import subprocess
 import shlex
 import shutil
+import os
+import sys
 
 from hpipe import errors
 # from hpipe.requires import require_call_once
@@ -24,26 +34,50 @@ __all__ = ("Pipeline", "Job", "define_job")
 Stage = str
 JobProcedure = Callable[..., None]
 
-logger = getLogger("pipeline")
+logger = getLogger(__name__)
+
+
+_which_cache: Dict[str, Optional[str]] = {}
+_SENTINEL = object()
+
+
+def _which_cached(command: str) -> Optional[str]:
+    path = _which_cache.get(command, _SENTINEL)
+    if path is not _SENTINEL:
+        return path
+    return _which_cache.setdefault(command, shutil.which(command))
+
+
+def invalidate_which_cache() -> None:
+    """Forgets found programs. Call it if `PATH` was changed."""
+    _which_cache.clear()
 
 
 def echo(command: str):
     print(command)
 
 
+@lru_cache(maxsize=256)
+def _split_command(command: str) -> Tuple[str, ...]:
+    return tuple(shlex.split(command))
+
+
 def shell_execute(command: str, *, timeout: Optional[float] = None) -> int:
-    process = subprocess.Popen(args=shlex.split(command))
-    process.wait(timeout=timeout)
-    return process.returncode
+    return subprocess.run(_split_command(command), timeout=timeout, check=False).returncode
 
 
-@dataclass
+# NOTE(gr3yknigh1): Compared by identity, so jobs can be used as keys. [2025/06/18]
+@dataclass(eq=False)
 class Job:
     stage: Stage
     handler: JobProcedure = field(repr=False)
     required_programs: Sequence[str]
     dry_run: bool = field(default=False)
 
+    # NOTE(gr3yknigh1): Identifiers of things job makes and uses, e.g. artefact names. [2025/06/18]
+    produces: Sequence[str] = field(default=())
+    consumes: Sequence[str] = field(default=())
+
 
 @dataclass
 class Context:
@@ -70,43 +104,60 @@ class Context:
 class Pipeline:
     stages: List[Stage]
     jobs: List[Job]
+    max_parallel: int
+
+    # NOTE(gr3yknigh1): Same as `stages`, for membership checks. [2025/06/18]
+    _stage_set: Set[Stage]
 
-    def __init__(self):
+    def __init__(self, *, max_parallel: Optional[int] = None):
+        """
+        :param max_parallel: How many jobs of one stage are executed at the same time. Defaults to count of CPUs.
+        """
         self.stages = []
+        self._stage_set = set()
         self.jobs = []
+        self.max_parallel = max_parallel if max_parallel is not None else (os.cpu_count() or 1)
 
     def __repr__(self):
-        return f"Pipeline(stages={self.stages!r}, jobs={self.jobs!r})"
+        return f"Pipeline(stages={self.stages!r}, jobs={self.jobs!r}, max_parallel={self.max_parallel!r})"
 
     # NOTE(gr3yknigh1): Doesn't work for more than one pipeline... [2025/03/16]
     # @require_call_once(error_message="Stages should be defined once")
     def define_stages(self, *stages: Stage):
-        duplicated_stages: Set[Stage] = set()
-
-        stage_counter: Counter[Stage] = Counter()
-        for stage in stages:
-            stage_counter[stage] += 1
-            if stage_counter[stage] > 1:
-                duplicated_stages.add(stage)
-
-        if len(duplicated_stages) > 0:
+        if len(set(stages)) != len(stages):
+            seen: Set[Stage] = set()
+            duplicated_stages: Set[Stage] = {
+                stage for stage in stages if stage in seen or seen.add(stage)
+            }
             raise errors.StagesAreAlreadyDefined(duplicated_stages, stages)
 
-        self.stages = list(stages)
+        # NOTE(gr3yknigh1): Stage names are interned, so lookups by them mostly compare pointers. [2025/06/18]
+        self.stages = [sys.intern(stage) for stage in stages]
+        self._stage_set = set(self.stages)
 
     def define_job(
-        self, *, stage: Stage, required_programs: Optional[Sequence[str]] = None
+        self,
+        *,
+        stage: Stage,
+        required_programs: Optional[Sequence[str]] = None,
+        produces: Sequence[str] = (),
+        consumes: Sequence[str] = (),
     ) -> Callable[[JobProcedure], JobProcedure]:
 
         if required_programs is None:
             required_programs = []
 
+        stage = sys.intern(stage)
+        required_programs = [sys.intern(program) for program in required_programs]
+
         def internal_job_procedure(job_procedure: JobProcedure) -> JobProcedure:
 
             job = Job(
                 stage=stage,
                 handler=job_procedure,
                 required_programs=required_programs,
+                produces=produces,
+                consumes=consumes,
             )
             self.jobs.append(job)
 
@@ -131,48 +182,147 @@ def execute_job(job: Job, *, dry_run=False) -> None:
 
 
 def execute_pipeline(pipeline: Pipeline, *, dry_run=False) -> None:
-    stages: Dict[str, List[Job]] = OrderedDict()
-
-    for stage in pipeline.stages:
-        stages[stage] = []
-
-    missing_programs: dict[Job, list[str]] = {}
+    stage_set = pipeline._stage_set
 
     for job in pipeline.jobs:
-        if job.stage not in pipeline.stages:
+        if job.stage not in stage_set:
             raise errors.StageIsNotDefined(job, pipeline.stages)
-        
-        for required_program in job.required_programs:
-            if shutil.which(required_program) is not None:
-                continue
-            
-            if job not in missing_programs.keys():
-                missing_programs[job] = []
-            missing_programs[job].append(required_program)
 
-        stages[job.stage].append(job)
+    # NOTE(gr3yknigh1): Every required program is checked before any job is started. [2025/06/18]
+    missing_programs: dict[Job, list[str]] = {}
 
+    which = _which_cached
+
+    for job in pipeline.jobs:
+        missing = [program for program in job.required_programs if which(program) is None]
+        if len(missing) > 0:
+            missing_programs[job] = missing
 
     if len(missing_programs) > 0:
         raise errors.PipelineMissingRequiredPrograms(missing=missing_programs)
 
-    for stage in stages.keys():
-        jobs = stages[stage]
-
-        if len(jobs) == 0:
+    # NOTE(gr3yknigh1): Jobs form dependency graph. Job which declares `consumes` depends only on jobs which
+    # produce what it consumes, so it may overlap with jobs of other stages. Job without it depends on every
+    # job of the previous stages, as it was with stage by stage execution. Stages are also the priority of
+    # ready jobs. [2025/06/18]
+    stage_indices: Dict[Stage, int] = {stage: index for index, stage in enumerate(pipeline.stages)}
+
+    # NOTE(gr3yknigh1): Sort is stable, so jobs of one stage keep order of definition. Jobs and their stage
+    # ranks are kept in parallel arrays. Jobs of stage with rank `i` are `ordered[stage_bounds[i]:stage_bounds[i + 1]]`.
+    # [2025/06/18]
+    ranked = sorted(((stage_indices[job.stage], job) for job in pipeline.jobs), key=itemgetter(0))
+    stage_ranks = array("i", (rank for rank, _ in ranked))
+    ordered: List[Job] = [job for _, job in ranked]
+    stage_bounds: List[int] = [bisect_left(stage_ranks, rank) for rank in range(len(pipeline.stages) + 1)]
+
+    for rank, stage in enumerate(pipeline.stages):
+        if stage_bounds[rank] == stage_bounds[rank + 1]:
             logger.warning(f"{stage!r} has no jobs!")
-            continue
 
-        failed_jobs: List[Job] = []
+    producers: Dict[str, List[int]] = {}
+
+    for index, job in enumerate(ordered):
+        for produced in job.produces:
+            producers.setdefault(produced, []).append(index)
+
+    dependents: List[List[int]] = [[] for _ in ordered]
+    unfinished_dependencies: List[int] = [0] * len(ordered)
+
+    for index, job in enumerate(ordered):
+        if len(job.consumes) > 0:
+            dependencies = {
+                producer
+                for consumed in job.consumes
+                for producer in producers.get(consumed, [])
+                if producer != index
+            }
+        else:
+            dependencies = set(range(stage_bounds[stage_ranks[index]]))
+
+        unfinished_dependencies[index] = len(dependencies)
+
+        for dependency in dependencies:
+            dependents[dependency].append(index)
+
+    ready = [
+        (stage_ranks[index], index)
+        for index in range(len(ordered))
+        if unfinished_dependencies[index] == 0
+    ]
+    heapq.heapify(ready)
+
+    _check_circular_dependency(ordered, dependents, unfinished_dependencies, ready)
+
+    failed_jobs: List[Job] = []
+    finished_jobs: List[Job] = []
+    max_workers = max(1, pipeline.max_parallel)
+
+    # NOTE(gr3yknigh1): Jobs mostly wait for commands they run, so threads are enough here. `dry_run` is passed
+    # to `execute_job` instead of being set on the job, because jobs are executed concurrently. [2025/06/18]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running: Dict[Future, int] = {}
+
+        # NOTE(gr3yknigh1): Bound once, used for every job. [2025/06/18]
+        submit = executor.submit
+        heappop = heapq.heappop
+        heappush = heapq.heappush
+        job_failed = errors.JobFailed
+
+        while len(ready) > 0 or len(running) > 0:
+
+            # NOTE(gr3yknigh1): After failure no new jobs are started, running ones are awaited. [2025/06/18]
+            while len(ready) > 0 and len(running) < max_workers and len(failed_jobs) == 0:
+                _, index = heappop(ready)
+                running[submit(execute_job, ordered[index], dry_run=dry_run)] = index
+
+            if len(running) == 0:
+                break
+
+            done, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                index = running.pop(future)
+
+                if isinstance(future.exception(), job_failed):
+                    failed_jobs.append(ordered[index])
+                    continue
+
+                future.result()
+                finished_jobs.append(ordered[index])
+
+                for dependent in dependents[index]:
+                    unfinished_dependencies[dependent] -= 1
+                    if unfinished_dependencies[dependent] == 0:
+                        heappush(ready, (stage_ranks[dependent], dependent))
+
+    if len(failed_jobs) > 0:
+        finished = set(finished_jobs)
+        skipped_jobs = [job for job in ordered if job not in finished and job not in failed_jobs]
+
+        if len(skipped_jobs) > 0:
+            logger.error(f"Skipped jobs because of failure: {skipped_jobs!r}")
+
+        raise errors.PipelineFailed(failed_jobs, skipped_jobs)
+
 
-        for job in jobs:
-            job.dry_run = dry_run
+def _check_circular_dependency(
+    jobs: List[Job],
+    dependents: List[List[int]],
+    unfinished_dependencies: List[int],
+    ready: List[tuple[int, int]],
+) -> None:
+    remaining = list(unfinished_dependencies)
+    queue = [index for _, index in ready]
+    visited = 0
 
-            try:
-                execute_job(job, dry_run=dry_run)
-            except errors.JobFailed:
-                failed_jobs.append(job)
+    while len(queue) > 0:
+        index = queue.pop()
+        visited += 1
 
-        if len(failed_jobs) > 0:
-            break
+        for dependent in dependents[index]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                queue.append(dependent)
 
+    if visited != len(jobs):
+        raise errors.CircularDependency([job for job, count in zip(jobs, remaining) if count > 0])
@@ -1,7 +1,6 @@
 from __future__ import annotations
 from typing import TypeVar
 from typing import Callable
-from typing import Set
 
 import sys
 
@@ -17,20 +16,20 @@ __all__ = ("AlreadyCalledError", "require_call_once")
 
 class AlreadyCalledError(Exception): ...
 
-_already_called: Set[Callable] = set()
-
 # TODO(gr3yknigh1): Doesn't work for methods! [2025/03/16]
 def require_call_once(*, error_message: str):
     def internal(
         func: Callable[_ParamsType, _ReturnType],
     ) -> Callable[_ParamsType, _ReturnType]:
+        called = False
+
         def wrapper(
             *args: _ParamsType.args, **kwargs: _ParamsType.kwargs
         ) -> _ReturnType:
-            global _already_called
-            if func in _already_called:
+            nonlocal called
+            if called:
                 raise AlreadyCalledError(f"{func.__name__}(): {error_message}")
-            _already_called.add(func)
+            called = True
 
             return func(*args, **kwargs)
         return wrapper
@@ -13,10 +13,11 @@ def load_env(file: str) -> dict[str, str]:
     with open(file, mode="r") as f:
         s = f.read()
 
+        # NOTE(gr3yknigh1): Values may contain `=` too, so line is split on the first one only. [2025/06/18]
         env = {
-            item[0]: item[1]
-            for item in (l.split("=") for l in s.splitlines())
-            if len(item) == 2
+            name: value
+            for name, separator, value in (l.partition("=") for l in s.splitlines())
+            if separator
         }
     return env
 
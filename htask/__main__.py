@@ -4,7 +4,8 @@ from typing import Any
 from typing import TypeVar
 from typing import Callable
 
-from functools import partial
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
 import os
 import sys
 import inspect
@@ -20,16 +21,34 @@ SWITCH_START = "-"
 
 Ty = TypeVar("Ty")
 
+# NOTE(gr3yknigh1): `working_dir` of `None` means current working directory. [2025/06/18]
+DEFAULT_ARGS: dict[str, Any] = {
+    "working_dir": None,
+    "task_file": "tasks.py",
+    "echo": True,
+    "dry_run": False,
+}
+
 
 class ArgumentParser:
     arguments: list[ArgumentDescription[Any]]
 
+    # NOTE(gr3yknigh1): Switch -> argument, for all of `arguments`. [2025/06/18]
+    _switch_index: dict[str, ArgumentDescription[Any]]
+    _dests: set[str]
+
+    # NOTE(gr3yknigh1): Dest -> default, for all of `arguments`. Copied for each parse. [2025/06/18]
+    _defaults: dict[str, Any]
+
     parse_arguments: list[str]
     parse_index: int
     parse_current: str
 
     def __init__(self):
         self.arguments = []
+        self._switch_index = {}
+        self._dests = set()
+        self._defaults = {}
 
         self.parse_arguments = []
         self.parse_index = -1
@@ -51,6 +70,11 @@ class ArgumentParser:
     def should_stop(self) -> bool:
         return self.parse_index >= len(self.parse_arguments)
 
+    def _seek(self, index: int) -> None:
+        self.parse_index = index
+        if index < len(self.parse_arguments):
+            self.parse_current = self.parse_arguments[index]
+
     def add_argument(
         self,
         *switches: str,
@@ -67,14 +91,19 @@ class ArgumentParser:
             default=default,
         )
 
-        for argument in self.arguments:
-            if dest != argument.dest:
-                continue
+        if dest in self._dests:
+            old_argument = next(argument for argument in self.arguments if argument.dest == dest)
             raise Exception(
-                f"Already have option with same 'dest'! new={new_argument!r} old={argument!r}"
+                f"Already have option with same 'dest'! new={new_argument!r} old={old_argument!r}"
             )  # @cleanup
 
+        self._dests.add(dest)
+        self._defaults[dest] = default
         self.arguments.append(new_argument)
+
+        for switch in new_argument.switches:
+            self._switch_index.setdefault(switch, new_argument)
+
         return new_argument
 
     def parse_args(self, arguments: list[str]) -> dict[str, Any]:
@@ -82,61 +111,96 @@ class ArgumentParser:
         return self.parse_switches(self.arguments)
 
     def parse_switches(
-        self, arguments: list[ArgumentDescription] | None = None
+        self,
+        arguments: list[ArgumentDescription] | None = None,
+        defaults: dict[str, Any] | None = None,
     ) -> dict[str, Any | None]:
         # NOTE(gr3yknigh1): Hack! [2025/03/16]
         if arguments is None:
             arguments = self.arguments
 
-        swicthes: dict[str, Any | None] = {
-            argument.dest: argument.default for argument in arguments
-        }
-
-        while self.peek_argument(1).startswith(SWITCH_START) and not self.should_stop():
-            self.parse_advance()
+        if arguments is self.arguments:
+            switch_index = self._switch_index
+        else:
+            switch_index = {}
 
+            # NOTE(gr3yknigh1): First argument with the switch wins, as with linear search. [2025/06/18]
             for argument in arguments:
-                if self.parse_current not in argument.switches:
-                    continue
+                for switch in argument.switches:
+                    switch_index.setdefault(switch, argument)
 
-                if argument.format == ArgumentFormat.STORE_VALUE:
-                    swicthes[argument.dest] = argument.convert(self.parse_advance())
-                elif argument.format == ArgumentFormat.STORE_TRUE:
-                    swicthes[argument.dest] = True
-                elif argument.format == ArgumentFormat.STORE_FALSE:
-                    swicthes[argument.dest] = False
-                break
-            else:
+        if defaults is None:
+            defaults = self._defaults if arguments is self.arguments else {
+                argument.dest: argument.default for argument in arguments
+            }
+
+        swicthes: dict[str, Any | None] = defaults.copy()
+
+        # NOTE(gr3yknigh1): Cursor is kept in local variable and written back once, instead of going through
+        # `parse_advance` and `peek_argument` for every token. [2025/06/18]
+        parse_arguments = self.parse_arguments
+        count = len(parse_arguments)
+        index = self.parse_index
+
+        while index + 1 < count and parse_arguments[index + 1][:1] == SWITCH_START:
+            index += 1
+            switch = parse_arguments[index]
+
+            argument = switch_index.get(switch, None)
+
+            if argument is None:
                 raise Exception(
-                    f"Unrecognized argument: {self.parse_current!r}. Argument={arguments!r}"
+                    f"Unrecognized argument: {switch!r}. Argument={arguments!r}"
                 )
 
-        self.parse_advance()
+            if argument.format == ArgumentFormat.STORE_VALUE:
+                index += 1
+
+                if index >= count:
+                    raise Exception(f"Missing value of argument: {switch!r}")
+
+                swicthes[argument.dest] = argument.convert(parse_arguments[index])
+            elif argument.format == ArgumentFormat.STORE_TRUE:
+                swicthes[argument.dest] = True
+            elif argument.format == ArgumentFormat.STORE_FALSE:
+                swicthes[argument.dest] = False
+
+        self._seek(min(index + 1, count))
         return swicthes
 
     def parse_task_args(
-        self, descriptions: dict[str, list[ArgumentDescription]]
+        self, descriptions: TaskArgumentDescriptions
     ) -> tuple[list[str], dict[str, dict[str, Any]], list[str]]:
         requested_tasks: list[str] = []
         arguments: dict[str, dict[str, Any]] = {}
         unknown_tasks: list[str] = []
 
-        while not self.should_stop():
-            task_name = self.parse_current
+        parse_arguments = self.parse_arguments
+        count = len(parse_arguments)
+        index = self.parse_index
 
-            if task_name not in descriptions.keys():
+        while index < count:
+            task_name = parse_arguments[index]
+
+            if task_name not in descriptions:
                 unknown_tasks.append(task_name)
+                index += 1
+
                 # NOTE(gr3yknigh1): Skipping options of unknown task [2025/03/16]
-                while self.peek_argument(1).startswith(SWITCH_START):
-                    _ = self.parse_advance(), self.parse_advance()
+                while index < count and parse_arguments[index][:1] == SWITCH_START:
+                    index += 2
             else:
                 requested_tasks.append(task_name)
+
+                # NOTE(gr3yknigh1): `parse_switches` stops at the token after the last switch, which is the next
+                # task. [2025/06/18]
+                self._seek(index)
                 arguments[task_name] = self.parse_switches(
-                    descriptions[task_name]
+                    descriptions[task_name], descriptions.get_defaults(task_name)
                 )
+                index = self.parse_index
 
-            self.parse_advance()
-
+        self._seek(min(index, count))
         return requested_tasks, arguments, unknown_tasks
 
 
@@ -165,103 +229,306 @@ def load_tasks(
     return tasks
 
 
+def index_tasks(tasks: list[Task]) -> dict[str, Task]:
+    """Indexes tasks by name. Duplicates are reported by `check_duplicate_tasks` only for tasks which are
+    going to run, so stray duplicate in task file doesn't break other tasks.
+    """
+
+    tasks_by_name: dict[str, Task] = {}
+
+    for task in tasks:
+        tasks_by_name.setdefault(task.name, task)
+
+    return tasks_by_name
+
+
+def check_duplicate_tasks(tasks: list[Task], names: set[str]) -> None:
+    seen: dict[str, Task] = {}
+
+    for task in tasks:
+        if task.name not in names:
+            continue
+
+        if task.name in seen:
+            raise Exception(
+                f"Found tasks with same name! new={task!r} old={seen[task.name]!r}"
+            )
+        seen[task.name] = task
+
+
+def collect_task_closure(requested_tasks: list[str], tasks_by_name: dict[str, Task]) -> set[str]:
+    """Returns names of requested tasks and everything they depend on (recursively)."""
+
+    closure: set[str] = set()
+    stack = list(requested_tasks)
+
+    while len(stack) > 0:
+        name = stack.pop()
+
+        if name in closure or name not in tasks_by_name:
+            continue
+
+        closure.add(name)
+        stack.extend(tasks_by_name[name].depends_on)
+
+    return closure
+
+
+def collect_dependencies(
+    task: Task,
+    tasks_by_name: dict[str, Task],
+    finished: set[str],
+) -> dict[str, list[str]]:
+    """Returns not finished dependencies of the task (recursively) with their own dependencies."""
+
+    dependencies: dict[str, list[str]] = {}
+    visiting: list[str] = [task.name]
+
+    def visit(name: str) -> None:
+        for dependency in tasks_by_name[name].depends_on:
+            if dependency not in tasks_by_name:
+                raise Exception(f"Task depends on unknown task! task={name!r} dependency={dependency!r}")
+
+            if dependency in visiting:
+                raise Exception(f"Found circular dependency between tasks! tasks={[*visiting, dependency]!r}")
+
+            if dependency in finished or dependency in dependencies:
+                continue
+
+            dependencies[dependency] = [
+                other for other in tasks_by_name[dependency].depends_on if other not in finished
+            ]
+
+            visiting.append(dependency)
+            visit(dependency)
+            visiting.pop()
+
+    visit(task.name)
+    return dependencies
+
+
+def run_dependencies(
+    context: Context,
+    dependencies: dict[str, list[str]],
+    tasks_by_name: dict[str, Task],
+    tasks_args: dict[str, dict[str, Any]],
+    descriptions: TaskArgumentDescriptions,
+    finished: set[str],
+    executor: ThreadPoolExecutor,
+) -> None:
+    """Runs dependencies in parallel once everything they depend on is finished.
+
+    Dependencies which weren't requested get default values of their arguments, as requested tasks do.
+    """
+
+    waiting = dict(dependencies)
+    running: dict[Future, Task] = {}
+    failure: BaseException | None = None
+
+    while waiting or running:
+        if failure is None:
+            for name, names in list(waiting.items()):
+                task = tasks_by_name[name]
+
+                if not all(dependency in finished for dependency in names):
+                    continue
+
+                del waiting[name]
+
+                args = tasks_args[name] if name in tasks_args else descriptions.get_defaults(name).copy()
+                running[executor.submit(task.procedure, context, **args)] = task
+
+        if not running:
+            break
+
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            task = running.pop(future)
+
+            exception = future.exception()
+            if exception is not None:
+                failure = failure or exception
+            else:
+                finished.add(task.name)
+
+    if failure is not None:
+        raise failure
+
+
 def run_tasks(
     context: Context,
     requested_tasks: list[str],
     defined_tasks: list[Task],
     tasks_args: dict[str, dict[str, Any]],
+    *,
+    descriptions: TaskArgumentDescriptions | None = None,
+    max_workers: int | None = None,
 ):
-    for requested_task in requested_tasks:
-        for task in defined_tasks:
-            if requested_task != task.name:
-                continue
+    """Runs requested tasks one after another.
 
-            procedure = partial(
-                task.procedure, context, **tasks_args[task.name]
-            )
-            procedure()
+    Before each of them, it's dependencies (which haven't run yet) are run in parallel. Every task runs
+    once, even if it is requested after it already ran as dependency.
+    """
 
+    tasks_by_name = index_tasks(defined_tasks)
+    check_duplicate_tasks(defined_tasks, collect_task_closure(requested_tasks, tasks_by_name))
 
-def generate_argument_descriptions_for_tasks(
-    tasks: list[Task],
-) -> dict[str, list[ArgumentDescription]]:
-    result: dict[str, list[ArgumentDescription]] = {}
+    finished: set[str] = set()
 
-    for task in tasks:
-        # XXX
-    
-        if task.name not in result.keys():
-            result[task.name] = []
-
-        sig = inspect.signature(task.procedure)
-
-        for p_index, (p_name, p_obj) in enumerate(sig.parameters.items()):
-            # TODO(gr3yknigh1): Handle string type annotation [2025/03/16]
-            if (
-                p_index == 0
-                and p_obj.annotation != p_obj.empty
-                and p_obj.annotation is not Context
-            ):
-                raise Exception("First argument should be Context object!")
-
-            if p_index == 0:
+    if descriptions is None:
+        descriptions = generate_argument_descriptions_for_tasks(defined_tasks)
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as executor:
+        for requested_task in requested_tasks:
+            task = tasks_by_name[requested_task]
+
+            if task.name in finished:
                 continue
 
-            p_type: type | None = (
-                p_obj.annotation
-                if p_obj.annotation != p_obj.empty
-                else (
-                    type(p_obj.default)
-                    if p_obj.default != p_obj.empty
-                    else None
-                )
+            if task.depends_on:
+                dependencies = collect_dependencies(task, tasks_by_name, finished)
+                run_dependencies(context, dependencies, tasks_by_name, tasks_args, descriptions, finished, executor)
+
+            task.procedure(context, **tasks_args[task.name])
+            finished.add(task.name)
+
+
+@lru_cache(maxsize=None)
+def _cached_signature(procedure: Callable) -> inspect.Signature:
+    return inspect.signature(procedure)
+
+
+def get_signature(procedure: Callable) -> inspect.Signature:
+    signature = getattr(procedure, "__signature__", None)
+    if isinstance(signature, inspect.Signature):
+        return signature
+    return _cached_signature(procedure)
+
+
+def describe_task_arguments(task: Task) -> list[ArgumentDescription]:
+    result: list[ArgumentDescription] = []
+    empty = inspect.Parameter.empty
+
+    sig = get_signature(task.procedure)
+
+    for p_index, p_obj in enumerate(sig.parameters.values()):
+        # TODO(gr3yknigh1): Handle string type annotation [2025/03/16]
+        if (
+            p_index == 0
+            and p_obj.annotation != empty
+            and p_obj.annotation is not Context
+        ):
+            raise Exception("First argument should be Context object!")
+
+        if p_index == 0:
+            continue
+
+        p_type: type | None = (
+            p_obj.annotation
+            if p_obj.annotation != empty
+            else (
+                type(p_obj.default)
+                if p_obj.default != empty
+                else None
             )
+        )
 
-            result[task.name].append(
-                ArgumentDescription(
-                    dest=p_name,
-                    switches=generate_switches(p_name),
-                    convert=p_type if p_type is not None else str,
-                    format=(
-                        ArgumentFormat.STORE_VALUE
-                        if p_type is not bool
-                        else ArgumentFormat.STORE_TRUE
-                    ),
-                    default=(
-                        p_obj.default if p_obj.default != p_obj.empty else None
-                    ),
-                )
+        result.append(
+            ArgumentDescription(
+                dest=p_obj.name,
+                switches=generate_switches(p_obj.name),
+                convert=p_type if p_type is not None else str,
+                format=(
+                    ArgumentFormat.STORE_VALUE
+                    if p_type is not bool
+                    else ArgumentFormat.STORE_TRUE
+                ),
+                default=(
+                    p_obj.default if p_obj.default != empty else None
+                ),
             )
+        )
 
     return result
 
 
+class TaskArgumentDescriptions:
+    """Argument descriptions of tasks by task name. Task is inspected only when its descriptions are requested."""
+
+    _by_name: dict[str, Task]
+    _descriptions: dict[str, list[ArgumentDescription]]
+    _defaults: dict[str, dict[str, Any]]
+
+    def __init__(self, tasks: list[Task]):
+        self._descriptions = {}
+        self._defaults = {}
+        self._by_name = index_tasks(tasks)
+
+    def __contains__(self, task_name: object) -> bool:
+        return task_name in self._by_name
+
+    def __getitem__(self, task_name: str) -> list[ArgumentDescription]:
+        descriptions = self._descriptions.get(task_name, None)
+
+        if descriptions is None:
+            descriptions = describe_task_arguments(self._by_name[task_name])
+            self._descriptions[task_name] = descriptions
+
+        return descriptions
+
+    def get_defaults(self, task_name: str) -> dict[str, Any]:
+        """Default values of task arguments by dest. Shared, should be copied before modification."""
+
+        defaults = self._defaults.get(task_name, None)
+
+        if defaults is None:
+            defaults = {argument.dest: argument.default for argument in self[task_name]}
+            self._defaults[task_name] = defaults
+
+        return defaults
+
+
+def generate_argument_descriptions_for_tasks(
+    tasks: list[Task],
+) -> TaskArgumentDescriptions:
+    return TaskArgumentDescriptions(tasks)
+
+
+@lru_cache(maxsize=256)
+def _generate_switches(name: str) -> tuple[str, ...]:
+    return (SWITCH_START + name[0], SWITCH_START + SWITCH_START + name.replace("_", "-"))
+
+
 def generate_switches(name: str) -> list[str]:
-    result = []
-    result.append("{}{}".format(SWITCH_START, name[0]))
-    result.append(
-        "{}{}{}".format(SWITCH_START, SWITCH_START, name.replace("_", "-"))
-    )
-    return result
+    # NOTE(gr3yknigh1): Cached value is shared, so caller gets it's own copy. [2025/06/18]
+    return list(_generate_switches(name))
 
 
 def main(argv: list[str] | None = None) -> int:
     argv = argv if argv is not None else sys.argv
     argv = argv[1:]
 
+    # NOTE(gr3yknigh1): Without switches every argument is a task name, so parser isn't needed. [2025/06/18]
+    has_switches = any(argument[:1] == SWITCH_START for argument in argv)
+
     parser = ArgumentParser()
-    parser.add_argument(
-        "-C", "--directory", dest="working_dir", type=str, default=os.getcwd()
-    )
-    parser.add_argument(
-        "-f", "--file", dest="task_file", type=str, default="tasks.py"
-    )
-    parser.add_argument("-e", dest="echo", type=bool, default=True)
-    parser.add_argument("-n", "--dry-run", dest="dry_run", default=False)
 
-    args = parser.parse_args(argv)
-    working_dir = args.get("working_dir")
-    assert working_dir
+    if has_switches:
+        parser.add_argument(
+            "-C", "--directory", dest="working_dir", type=str, default=DEFAULT_ARGS["working_dir"]
+        )
+        parser.add_argument(
+            "-f", "--file", dest="task_file", type=str, default=DEFAULT_ARGS["task_file"]
+        )
+        parser.add_argument("-e", dest="echo", type=bool, default=DEFAULT_ARGS["echo"])
+        parser.add_argument("-n", "--dry-run", dest="dry_run", default=DEFAULT_ARGS["dry_run"])
+
+        args = parser.parse_args(argv)
+    else:
+        args = DEFAULT_ARGS
+
+    working_dir = args.get("working_dir") or os.getcwd()
 
     working_dir = os.path.abspath(working_dir)
 
@@ -280,9 +547,17 @@ def main(argv: list[str] | None = None) -> int:
     defined_tasks = load_tasks(os.path.join(working_dir, task_file))
     descriptions = generate_argument_descriptions_for_tasks(defined_tasks)
 
-    requested_tasks, tasks_args, unknown_tasks = parser.parse_task_args(
-        descriptions
-    )
+    if has_switches:
+        requested_tasks, tasks_args, unknown_tasks = parser.parse_task_args(
+            descriptions
+        )
+    else:
+        requested_tasks = [task_name for task_name in argv if task_name in descriptions]
+        unknown_tasks = [task_name for task_name in argv if task_name not in descriptions]
+        tasks_args = {
+            task_name: descriptions.get_defaults(task_name).copy()
+            for task_name in requested_tasks
+        }
 
     if len(unknown_tasks) > 0:
         raise Exception(f"Found unknown tasks! {unknown_tasks!r}")
@@ -299,7 +574,7 @@ def main(argv: list[str] | None = None) -> int:
         )
     )
 
-    run_tasks(context, requested_tasks, defined_tasks, tasks_args)
+    run_tasks(context, requested_tasks, defined_tasks, tasks_args, descriptions=descriptions)
 
     return 0
 
@@ -0,0 +1,137 @@
+"""Content-addressed cache of build outputs.
+
+Outputs of a command are stored under the key which is computed from the command line and content of
+all of it's inputs. If the same command is run again with the same inputs, outputs are copied from the
+cache instead.
+
+Inputs which are known only after the command has run (e.g. included headers) are stored as manifest
+under the key of the command and known inputs.
+"""
+from __future__ import annotations
+
+import os
+import os.path
+import json
+import mmap
+import shutil
+import hashlib
+import threading
+
+
+__all__ = (
+    "get_cache_folder",
+    "compute_file_digest",
+    "compute_key",
+    "try_hit",
+    "store",
+    "load_manifest",
+    "store_manifest",
+)
+
+
+def get_cache_folder() -> str:
+    """Returns folder of the cache. Can be changed with `HTASK_CACHE_DIR` environment variable."""
+
+    cache_folder = os.environ.get("HTASK_CACHE_DIR")
+    if cache_folder:
+        return cache_folder
+
+    cache_folder = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_folder, "htask", "outputs")
+
+
+def compute_file_digest(file: str) -> bytes:
+    file_hash = hashlib.blake2b(digest_size=32)
+
+    with open(file, "rb") as f:
+        # NOTE(gr3yknigh1): Empty files can't be mapped. [2025/06/18]
+        if os.fstat(f.fileno()).st_size == 0:
+            return file_hash.digest()
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            file_hash.update(m)
+
+    return file_hash.digest()
+
+
+def compute_key(command: str, input_files: list[str]) -> str:
+    """Hashes command line with content of every input file.
+
+    Inputs which aren't files (e.g. libraries which are found by the linker) are hashed by name only.
+    """
+
+    key_hash = hashlib.blake2b(command.encode("utf-8"), digest_size=32)
+
+    for input_file in input_files:
+        key_hash.update(input_file.encode("utf-8"))
+
+        if os.path.isfile(input_file):
+            key_hash.update(compute_file_digest(input_file))
+
+    return key_hash.hexdigest()
+
+
+def _get_entry_folder(key: str) -> str:
+    return os.path.join(get_cache_folder(), key[:2], key)
+
+
+def _get_temporary_path(path: str) -> str:
+    # NOTE(gr3yknigh1): Same output may be copied by several threads and processes at once. [2025/06/18]
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def try_hit(key: str, outputs: list[str]) -> bool:
+    """Copies cached outputs to their places. Returns `False` if some of them isn't in the cache."""
+
+    entry_folder = _get_entry_folder(key)
+    cached_outputs = [os.path.join(entry_folder, str(index)) for index in range(len(outputs))]
+
+    if not all(os.path.isfile(cached_output) for cached_output in cached_outputs):
+        return False
+
+    for cached_output, output in zip(cached_outputs, outputs):
+        # NOTE(gr3yknigh1): Copy is renamed into place, so the output is never seen half-written. [2025/06/18]
+        temporary_output = _get_temporary_path(output)
+        shutil.copyfile(cached_output, temporary_output)
+        os.replace(temporary_output, output)
+
+    return True
+
+
+def store(key: str, outputs: list[str]) -> None:
+    """Puts outputs into the cache under the key."""
+
+    entry_folder = _get_entry_folder(key)
+    os.makedirs(entry_folder, exist_ok=True)
+
+    for index, output in enumerate(outputs):
+        cached_output = os.path.join(entry_folder, str(index))
+        temporary_output = _get_temporary_path(cached_output)
+        shutil.copyfile(output, temporary_output)
+        os.replace(temporary_output, cached_output)
+
+
+def load_manifest(key: str) -> list[str] | None:
+    """Returns input files which were stored under the key by `store_manifest`."""
+
+    try:
+        with open(os.path.join(_get_entry_folder(key), "manifest.json"), "r", encoding="utf-8") as f:
+            files = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    return files if isinstance(files, list) else None
+
+
+def store_manifest(key: str, files: list[str]) -> None:
+    """Stores input files under the key. Replaces files which were stored before."""
+
+    entry_folder = _get_entry_folder(key)
+    os.makedirs(entry_folder, exist_ok=True)
+
+    manifest = os.path.join(entry_folder, "manifest.json")
+    temporary_manifest = _get_temporary_path(manifest)
+
+    with open(temporary_manifest, "w", encoding="utf-8") as f:
+        json.dump(files, f)
+    os.replace(temporary_manifest, manifest)
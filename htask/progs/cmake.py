@@ -6,6 +6,8 @@ from os.path import join, exists
 import os
 import os.path
 import shutil
+import stat
+import functools
 
 
 from htask import Context
@@ -14,12 +16,18 @@ from htask import Context
 __all__ = ("configure",)
 
 
+# NOTE(gr3yknigh1): `PATH` is walked once per program for whole process. [2025/06/18]
+@functools.lru_cache(maxsize=None)
+def _find_executable(name: str) -> str | None:
+    return shutil.which(name)
+
+
 def is_file_executable(file_path: str) -> bool:
-    return (
-        os.path.exists 
-        and os.path.isfile(file_path) 
-        and os.access(file_path, os.X_OK)
-    )
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return False
+    return stat.S_ISREG(st.st_mode) and os.access(file_path, os.X_OK)
 
 
 def configure(
@@ -33,10 +41,9 @@ def configure(
 ) -> Result:
 
     if cmake_executable is None:
-        cmake_executable = shutil.which("cmake")
+        cmake_executable = _find_executable("cmake")
         if cmake_executable is None:
             raise Exception("Failed to find cmake executable in the PATH.") # TODO(gr3yknigh1): Make custom exception [2025/05/02] #error_handling
-        assert is_file_executable(cmake_executable)
 
     source_folder = source_folder if source_folder is not None else os.getcwd()
     build_folder = build_folder if build_folder is not None else join(source_folder, "build")
@@ -67,10 +74,9 @@ def build(
 ) -> Result:
 
     if cmake_executable is None:
-        cmake_executable = shutil.which("cmake")
+        cmake_executable = _find_executable("cmake")
         if cmake_executable is None:
             raise Exception("Failed to find cmake executable in the PATH.") # TODO(gr3yknigh1): Make custom exception [2025/05/02] #error_handling
-        assert is_file_executable(cmake_executable)
 
     source_folder = source_folder if source_folder is not None else os.getcwd()
     build_folder = build_folder if build_folder is not None else join(source_folder, "build")
@@ -1,9 +1,22 @@
 from __future__ import annotations
+
+import json
+import shutil
+import hashlib
+import functools
+import os
+import os.path
+import sys
+import locale
+
 from typing import Any
+from typing import NamedTuple
+from typing import cast
 
 from enum import StrEnum, IntEnum, auto
 
 from htask import Context, Result
+from htask import buildcache
 
 
 #
@@ -11,8 +24,37 @@ from htask import Context, Result
 #
 DEFAULT_VC_BOOSTRAP_VARS = ["INCLUDE", "LIB", "LIBPATH", "PATH"]
 
+# NOTE(gr3yknigh1): Compiler alone (`/c`, `/Zs`) doesn't look at the libraries, linker doesn't look at the
+# headers. [2025/06/18]
+COMPILER_ENV_VARS = ("INCLUDE", "PATH")
+LINKER_ENV_VARS = ("LIB", "LIBPATH", "PATH")
+
+
+class VcEnv(NamedTuple):
+    full: dict[str, Any]
+    compiler: dict[str, Any]
+    linker: dict[str, Any]
+
+
+def split_vc_env(env: dict[str, Any]) -> VcEnv:
+    """Splits environment from `extract_env_from_vcvars` into parts needed by compiler and linker."""
+
+    return VcEnv(
+        full=env,
+        compiler={name: env[name] for name in COMPILER_ENV_VARS if name in env},
+        linker={name: env[name] for name in LINKER_ENV_VARS if name in env},
+    )
+
 
 def find_vcvars(c: Context) -> str | None:
+    _ = c
+
+    return _find_vcvars()
+
+
+# NOTE(gr3yknigh1): Locations are absolute, so they are probed once per process. [2025/06/18]
+@functools.lru_cache(maxsize=1)
+def _find_vcvars() -> str | None:
     
     #
     # Detect vcvarsall for x64 build...
@@ -20,16 +62,38 @@ def find_vcvars(c: Context) -> str | None:
     default_vc2022_bootstrap = r"C:\Program Files\Microsoft Visual Studio\2022\Community\VC\Auxiliary\Build\vcvarsall.bat"
     default_vc2019_bootstrap = r"C:\Program Files (x86)\Microsoft Visual Studio\2019\Preview\VC\Auxiliary\Build\vcvarsall.bat"
 
-    if c.exists(default_vc2022_bootstrap):
+    if os.path.exists(default_vc2022_bootstrap):
         return default_vc2022_bootstrap
 
-    if c.exists(default_vc2019_bootstrap):
+    if os.path.exists(default_vc2019_bootstrap):
         return default_vc2019_bootstrap
 
     return None
 
 
-def extract_env_from_vcvars(c: Context, arch="x64", vcvars: str | None = None, extract_vars: list[str] | None=None) -> dict[str, Any]:
+def get_shell_encoding() -> str:
+    """Returns encoding of output of shell builtins (e.g. `set`)."""
+    return "oem" if sys.platform == "win32" else locale.getpreferredencoding(False)
+
+
+def _vcvars_cache_path(key: str) -> str:
+    cache_folder = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_folder, "htask", f"vcvars-{key}.json")
+
+
+def extract_env_from_vcvars(
+    c: Context,
+    arch="x64",
+    vcvars: str | None = None,
+    extract_vars: list[str] | None=None,
+    use_cache=True,
+) -> dict[str, Any]:
+    """Runs vcvarsall and returns requested variables of environment it sets up.
+
+    :param use_cache: Reuse environment saved on disk by previous call with the same vcvarsall, architecture
+        and variables. Saved environment is dropped when vcvarsall is modified.
+    """
+
     if vcvars is None:
         vcvars = find_vcvars(c)
         
@@ -39,18 +103,52 @@ def extract_env_from_vcvars(c: Context, arch="x64", vcvars: str | None = None, e
     if extract_vars is None:
         extract_vars = DEFAULT_VC_BOOSTRAP_VARS
 
-    result = c.run(f"{c.quote(vcvars)} {arch} && set", capture_output=True)
+    cache_file: str | None = None
+
+    if use_cache and not c.config.dry_run:
+        try:
+            vcvars_mtime = os.path.getmtime(vcvars)
+        except OSError:
+            vcvars_mtime = None
+
+        if vcvars_mtime is not None:
+            key = hashlib.blake2b(
+                repr((vcvars, arch, tuple(sorted(extract_vars)), vcvars_mtime)).encode("utf-8"), digest_size=16
+            ).hexdigest()
+            cache_file = _vcvars_cache_path(key)
+
+            if os.path.exists(cache_file):
+                with open(cache_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+
+    result = c.run(f"{c.quote(vcvars)} {arch} && set", capture_output=True, encoding=None)
 
-    if result.output is None:
+    if result.raw_output is None:
         return {}
 
-    # NOTE(gr3yknigh1): Ha-ha, nasty, but it is on purpose! [2025/02/03]
-    env = {
-        item[0].upper() : item[1]
-        for item in (
-            l.split("=") for l in result.output.splitlines()
-        ) if len(item) == 2 and item[0].upper() in extract_vars
-    }
+    # NOTE(gr3yknigh1): `cmd.exe` writes output of it's builtins in OEM code page, not in UTF-8. Paths
+    # which can't be decoded shouldn't stop the build, so they are replaced. [2025/06/18]
+    encoding = get_shell_encoding()
+    extract_set = {name.upper().encode(encoding) for name in extract_vars}
+
+    # NOTE(gr3yknigh1): Only first `=` separates name from value, values may contain it too. Output is
+    # parsed as bytes, so only lines of extracted variables are decoded. [2025/06/18]
+    env: dict[str, Any] = {}
+
+    for line in result.raw_output.split(b"\n"):
+        name, separator, value = line.partition(b"=")
+        if separator and (name := name.upper()) in extract_set:
+            env[name.decode(encoding)] = value.rstrip(b"\r").decode(encoding, errors="replace")
+
+    # NOTE(gr3yknigh1): Written to temporary file first, so concurrent runs never read half-written
+    # cache. [2025/06/18]
+    if cache_file is not None and result.return_code == 0:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        temporary_file = f"{cache_file}.{os.getpid()}.tmp"
+
+        with open(temporary_file, "w", encoding="utf-8") as f:
+            json.dump(env, f)
+        os.replace(temporary_file, cache_file)
 
     return env
 
@@ -60,18 +158,46 @@ def extract_env_from_vcvars(c: Context, arch="x64", vcvars: str | None = None, e
 def format_defines(defines: dict[str, Any]) -> str:
 
     result = " ".join(
-        [f"/D {k}={v}" for k, v in defines.items() ]
+        f"/D {k}={v}" for k, v in defines.items()
     )
 
     return result
 
+RESPONSE_FILE_THRESHOLD = 4 * 1024
+
+SHOW_INCLUDES_PREFIX = "Note: including file:"
+
+
+def get_toolset_key(
+    program: str,
+    env: dict[str, Any],
+    variables: tuple[str, ...],
+    *,
+    inherit_env=True,
+) -> str:
+    """Identifies toolset which runs with the environment: full path of the program (it contains version of
+    MSVC) and values of variables it depends on (e.g. `INCLUDE`).
+    """
+
+    if inherit_env:
+        env = {**os.environ, **env}
+
+    values = {name.upper(): value for name, value in env.items()}
+    program_path = shutil.which(program, path=values.get("PATH")) or program
+
+    return repr((os.path.normcase(program_path), [values.get(variable, "") for variable in variables]))
+
+
 def format_includes(includes: list[str]) -> str:
-    result = " ".join(
-        [f"/I {include}" for include in includes]
-    )
+    result = " ".join(map("/I {}".format, includes))
     return result
 
 
+def get_pch_path(pch_header: str, folder: str) -> str:
+    """Returns path of precompiled header for given header in the build folder."""
+    return os.path.join(folder, f"{os.path.splitext(os.path.basename(pch_header))[0]}.pch")
+
+
 class OutputKind(StrEnum):
     EXECUTABLE="executable"
     OBJECT_FILE="object_file"
@@ -128,13 +254,117 @@ EXCEPTION_HANDLE_TO_FLAG = {
 
     
 
+# NOTE(gr3yknigh1): Options are the same for most of the calls during the build, so flags for each
+# combination of them are computed once. `typed`, because `mp_processes` of `True` and `1` are equal, but
+# give different flags. [2025/06/18]
+@functools.lru_cache(maxsize=256, typed=True)
+def format_option_flags(
+    *,
+    only_compilation: bool,
+    only_preprocessor: bool,
+    produce_pdb: bool,
+    embed_debug_info: bool,
+    use_ccache: bool,
+    optimization_level: OptimizationLevel | None,
+    mp_processes: int | bool | None,
+    cg_threads: int | None,
+    language_standard: LanguageStandard | None,
+    runtime_library: RuntimeLibrary | None,
+    exception_handle: ExceptionHandle | None,
+    debug_info_mode: DebugInfoMode | None,
+    fast_link: bool,
+    is_dll: bool,
+) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Returns compiler and linker flags which are controlled by options of `compile`."""
+
+    compile_flags: list[str] = []
+    link_flags: list[str] = []
+
+    if only_compilation:
+        compile_flags.append("/c")
+
+    if only_preprocessor:
+        compile_flags.append("/P")
+
+    # NOTE(gr3yknigh1): With `/Zi` several `cl.exe` processes may write into the same PDB (e.g. under `/MP`,
+    # or when C and C++ sources of one target are compiled at once), so `/FS` serializes these writes through
+    # `mspdbsrv`. [2025/06/18]
+    if produce_pdb:
+        compile_flags.append("/Z7" if embed_debug_info else "/Zi")
+        if not embed_debug_info:
+            compile_flags.append("/FS")
+
+    if use_ccache:
+        compile_flags.append("/showIncludes")
+
+    if language_standard is not None:
+        compile_flags.append(f"/std:{language_standard!s}")
+
+    if exception_handle is not None:
+        exception_handle_flag = EXCEPTION_HANDLE_TO_FLAG[exception_handle]
+        compile_flags.append(exception_handle_flag)
+
+    if runtime_library is not None:
+
+        if runtime_library == RuntimeLibrary.STATIC:
+            compile_flags.append("/MT")
+        elif runtime_library == RuntimeLibrary.STATIC_DEBUG:
+            compile_flags.append("/MTd")
+        elif runtime_library == RuntimeLibrary.DYNAMIC:
+            compile_flags.append("/MD")
+        elif runtime_library == RuntimeLibrary.DYNAMIC_DEBUG:
+            compile_flags.append("/MDd")
+        else:
+            raise NotImplementedError("...")
+
+    if optimization_level is not None:
+
+        if optimization_level == OptimizationLevel.DISABLED:
+            compile_flags.append("/Od")
+        elif optimization_level == OptimizationLevel.MINIMIZE_SIZE:
+            compile_flags.append("/O1")
+        elif optimization_level == OptimizationLevel.MAXIMIZE_SPEED:
+            compile_flags.append("/O2")
+
+    # NOTE(gr3yknigh1): `/MP` makes `cl.exe` compile given sources in several processes (`True` means one
+    # per core). It is incompatible with `/Gm`. [2025/06/18]
+    if mp_processes:
+        compile_flags.append("/MP" if mp_processes is True else f"/MP{int(mp_processes)}")
+
+    if cg_threads is not None:
+        compile_flags.append(f"/cgthreads{int(cg_threads)}")
+
+    if is_dll:
+        link_flags.append("/DLL")
+
+    # NOTE(gr3yknigh1): `/DEBUG:FASTLINK` with `/INCREMENTAL` makes link time proportional to the change
+    # instead of the binary size. Optimized builds link fully. [2025/06/18]
+    if debug_info_mode is None and produce_pdb and fast_link and not only_compilation:
+        debug_info_mode = DebugInfoMode.FASTLINK
+
+    if debug_info_mode is not None:
+        link_flags.append(f"/DEBUG:{debug_info_mode!s}")
+
+        if (
+            fast_link
+            and debug_info_mode != DebugInfoMode.NONE
+            and optimization_level != OptimizationLevel.MAXIMIZE_SPEED
+        ):
+            link_flags.append("/INCREMENTAL")
+
+    return tuple(compile_flags), tuple(link_flags)
+
+
 def compile(
     c: Context,
     sources: list[str],
     *,
-    output: str,
+    output: str | None = None,
+    output_dir: str | None = None,
     output_kind=OutputKind.EXECUTABLE,
     output_debug_info_path: str | None = None,
+    response_file: str | None = None,
+    source_dependencies: str | None = None,
     libs: list[str] | None=None,
     defines: dict[str, Any] | None=None,
     includes: list[str] | None=None,
@@ -146,15 +376,30 @@ def compile(
     produce_pdb=False,
     unicode_support=False,
     optimization_level: OptimizationLevel | None = None,
+    mp_processes: int | bool | None = None,
+    cg_threads: int | None = None,
+    compiler_launcher: str | None = None,
+    pch_header: str | None = None,
+    pch_source: str | None = None,
+    pch_out: str | None = None,
     language_standard: LanguageStandard | None = None,
     runtime_library: RuntimeLibrary | None = None,
     exception_handle: ExceptionHandle | None = None,
 
     # TODO(gr3yknigh1): Refactor linker flags out from this function [2025/06/03]
     debug_info_mode: DebugInfoMode | None = None,
+    fast_link=True,
     is_dll=False, 
+    use_build_cache=False,
     **kw
 ):
+    """Runs `cl.exe`.
+
+    :param use_build_cache: Take object files from `htask.buildcache` when toolset, command line, sources and
+        headers they included last time are the same. Only for object files without PDB server, PCH or
+        dependency files.
+    """
+
     if env is None:
         env = {}
 
@@ -179,79 +424,183 @@ def compile(
             _UNICODE=1,
         ))
 
-    if only_compilation:
-        compile_flags.append("/c")
+    # NOTE(gr3yknigh1): Launcher (`sccache`, `ccache`) caches object files between builds. They can't
+    # cache through PDB server, so debug info is embedded into object files with `/Z7` instead. [2025/06/18]
+    launcher = compiler_launcher or os.environ.get("HTASK_COMPILER_LAUNCHER")
+    embed_debug_info = bool(launcher)
+    use_ccache = bool(launcher) and os.path.splitext(os.path.basename(launcher))[0].lower() == "ccache"
+
+    if use_ccache:
+        # NOTE(gr3yknigh1): Depend mode of `ccache` takes includes from `/showIncludes` output and skips
+        # preprocessor pass on hits. [2025/06/18]
+        env = {**env, "CCACHE_DEPEND": "1"}
+
+    option_compile_flags, option_link_flags = format_option_flags(
+        only_compilation=only_compilation,
+        only_preprocessor=only_preprocessor,
+        produce_pdb=produce_pdb,
+        embed_debug_info=embed_debug_info,
+        use_ccache=use_ccache,
+        optimization_level=optimization_level,
+        mp_processes=mp_processes,
+        cg_threads=cg_threads,
+        language_standard=language_standard,
+        runtime_library=runtime_library,
+        exception_handle=exception_handle,
+        debug_info_mode=debug_info_mode,
+        fast_link=fast_link,
+        is_dll=is_dll,
+    )
+    compile_flags = [*compile_flags, *option_compile_flags]
+    link_flags = [*link_flags, *option_link_flags]
 
-    if only_preprocessor:
-        compile_flags.append("/P")
+    if output_debug_info_path is not None:
+        compile_flags.append(f"/Fd:{output_debug_info_path}")
 
-    if produce_pdb:
-        compile_flags.append("/Zi")
+    if source_dependencies is not None:
+        compile_flags.append(f"/sourceDependencies {source_dependencies}")
+
+    if output_dir is not None:
+        # NOTE(gr3yknigh1): Trailing separator tells `cl.exe` that it is a folder, so each source gets
+        # it's own object file named after it. [2025/06/18]
+        if output_kind != OutputKind.OBJECT_FILE:
+            raise Exception("Output folder is supported only for object files!")
+
+        # NOTE(gr3yknigh1): Objects of sources with the same name would overwrite each other. [2025/06/18]
+        object_names = [os.path.normcase(os.path.splitext(os.path.basename(source))[0]) for source in sources]
+        if len(set(object_names)) != len(object_names):
+            raise Exception(f"Sources with the same name can't share output folder! sources={sources!r}")
+
+        output_dir = output_dir.rstrip("\\/")
+        output_formatted = f"/Fo:{output_dir}\\"
+    elif output is None:
+        raise Exception("Either output or output folder should be specified!")
+    elif output_kind == OutputKind.OBJECT_FILE:
+        output_formatted = f"/Fo:{output}"
+    else:
+        output_formatted = f"/Fe:{output}"
 
-    if language_standard is not None:
-        compile_flags.append(f"/std:{language_standard!s}")
+    # NOTE(gr3yknigh1): Precompiled header is created by separate invocation for `pch_source`, other sources
+    # use it. Both get the same flags, so `cl.exe` doesn't reject it because of different runtime library.
+    # Without `pch_out` it is looked up in the build folder, so later calls need only `pch_header`. [2025/06/18]
+    pch_command: str | None = None
+    pch_flags: list[str] = []
+
+    if pch_header is not None:
+        if pch_out is None:
+            pch_out = get_pch_path(pch_header, output_dir if output_dir is not None else os.path.dirname(output or ""))
+
+        if pch_source is not None and pch_source in sources:
+            if output_dir is None:
+                raise Exception("Precompiled header can be created only with output folder!")
+
+            sources = [source for source in sources if source != pch_source]
+            pch_command = " ".join([
+                *compile_flags,
+                *([] if only_compilation else ["/c"]),
+                f"/Yc{pch_header}",
+                f"/Fp{pch_out}",
+                *(f"/D {k}={v}" for k, v in defines.items()),
+                pch_source,
+                output_formatted,
+                *(f"/I {include}" for include in includes),
+            ])
+
+        pch_flags = [f"/Yu{pch_header}", f"/Fp{pch_out}", f"/FI{pch_header}"]
+
+    # NOTE(gr3yknigh1): All options are collected in one list and joined once. [2025/06/18]
+    parts: list[str] = []
+    parts.extend(compile_flags)
+    parts.extend(pch_flags)
+    parts.extend(f"/D {k}={v}" for k, v in defines.items())
+    parts.extend(sources)
+    parts.append(output_formatted)
+    parts.extend(f"/I {include}" for include in includes)
+    parts.extend(libs)
+
+    if len(link_flags) > 0:
+        parts.append("/link")
+        parts.extend(link_flags)
+
+    options_formatted = " ".join(parts)
+
+    manifest_key: str | None = None
+    build_cache_outputs: list[str] = []
+
+    if (
+        use_build_cache
+        and not c.config.dry_run
+        and output_kind == OutputKind.OBJECT_FILE
+        and not only_preprocessor
+        and not (produce_pdb and not embed_debug_info)
+        and pch_header is None
+        and source_dependencies is None
+    ):
+        if output_dir is not None:
+            build_cache_outputs = [
+                os.path.join(output_dir, f"{os.path.splitext(os.path.basename(source))[0]}.obj")
+                for source in sources
+            ]
+        else:
+            build_cache_outputs = [cast(str, output)]
 
-    if exception_handle is not None:
-        exception_handle_flag = EXCEPTION_HANDLE_TO_FLAG[exception_handle]
-        compile_flags.append(exception_handle_flag)
+        # NOTE(gr3yknigh1): Like direct mode of `ccache`: the manifest key covers toolset, command line and
+        # sources, and the manifest lists headers which they included last time. Headers are taken from
+        # `/showIncludes` output of the compilation itself, so there is no separate scan. [2025/06/18]
+        toolset = get_toolset_key("cl.exe", env, ("INCLUDE",), inherit_env=kw.get("inherit_env", True))
+        manifest_key = buildcache.compute_key(f"{toolset} {launcher or ''} cl.exe {options_formatted}", sources)
+        include_files = buildcache.load_manifest(manifest_key)
 
-    if runtime_library is not None:
+        if include_files is not None and buildcache.try_hit(
+            buildcache.compute_key(manifest_key, include_files), build_cache_outputs
+        ):
+            return Result(return_code=0, output=None)
 
-        if runtime_library == RuntimeLibrary.STATIC:
-            compile_flags.append("/MT")
-        elif runtime_library == RuntimeLibrary.STATIC_DEBUG:
-            compile_flags.append("/MTd")
-        elif runtime_library == RuntimeLibrary.DYNAMIC:
-            compile_flags.append("/MD")
-        elif runtime_library == RuntimeLibrary.DYNAMIC_DEBUG:
-            compile_flags.append("/MDd")
-        else:
-            raise NotImplementedError("...")
+    # NOTE(gr3yknigh1): Long command lines (big batches, lots of includes) are passed through response file.
+    # Command line of Windows is limited to 8191 characters. [2025/06/18]
+    if response_file is not None and len(options_formatted) > RESPONSE_FILE_THRESHOLD:
+        with open(response_file, "w") as f:
+            f.write(options_formatted)
+        options_formatted = f"@{response_file}"
 
-    if optimization_level is not None:
+    command = f"cl.exe /nologo {options_formatted}"
 
-        if optimization_level == OptimizationLevel.DISABLED:
-            compile_flags.append("/Od")
-        elif optimization_level == OptimizationLevel.MINIMIZE_SIZE:
-            compile_flags.append("/O1")
-        elif optimization_level == OptimizationLevel.MAXIMIZE_SPEED:
-            compile_flags.append("/O2")
+    if manifest_key is not None and not use_ccache:
+        command = f"cl.exe /nologo /showIncludes {options_formatted}"
 
-    if is_dll:
-        link_flags.append("/DLL")
+    if launcher:
+        command = f"{launcher} {command}"
 
-    if debug_info_mode is not None:
-        link_flags.append(f"/DEBUG:{debug_info_mode!s}")
+    if pch_command is not None:
+        pch_command = f"cl.exe /nologo {pch_command}"
 
-    if output_debug_info_path is not None:
-        compile_flags.append(f"/Fd:{output_debug_info_path}")
+        if launcher:
+            pch_command = f"{launcher} {pch_command}"
 
-    compile_flags_formatted = " ".join(compile_flags)
-    defines_formatted = format_defines(defines)
-    includes_formatted = format_includes(includes)
-    libs_formatted = " ".join(libs)
-    sources_formatted = " ".join(sources)
+        result = c.run(pch_command, env=env, **kw)
 
-    if len(link_flags) == 0:
-        link_flags_formatted = ""
-    else:
-        link_flags_formatted = "/link {}".format(" ".join(link_flags))
-    
-    if output_kind == OutputKind.OBJECT_FILE:
-        output_formatted = f"/Fo:{output}"
-    else:
-        output_formatted = f"/Fe:{output}"
+        if result.return_code != 0 or len(sources) == 0:
+            return result
 
-    options = [
-        compile_flags_formatted, defines_formatted, sources_formatted, output_formatted, includes_formatted, libs_formatted, link_flags_formatted
-    ]
+    if manifest_key is None:
+        return c.run(command, env=env, **kw)
 
-    options_formatted = " ".join(options)
+    included_files: set[str] = set()
 
-    return c.run(
-        f"cl.exe /nologo {options_formatted}",
-        env=env, **kw
-    )
+    def on_line(line: str) -> None:
+        if line.startswith(SHOW_INCLUDES_PREFIX):
+            included_files.add(line[len(SHOW_INCLUDES_PREFIX):].strip())
+        else:
+            print(line, flush=True)
+
+    result = c.run(command, env=env, on_line=on_line, **kw)
+
+    if result.return_code == 0:
+        include_files = sorted(included_files)
+        buildcache.store(buildcache.compute_key(manifest_key, include_files), build_cache_outputs)
+        buildcache.store_manifest(manifest_key, include_files)
+
+    return result
 
 
 def link(
@@ -262,9 +611,20 @@ def link(
     output_kind=OutputKind.EXECUTABLE,
     output_debug_info_path: str | None = None,
     libraries: list[str] | None = None,
+    debug_info_mode: DebugInfoMode | None = None,
+    produce_pdb=False,
+    fast_link=True,
+    use_build_cache=False,
     env: dict[str, str] | None = None,
     kw: dict[str, Any] | None=None
 ) -> Result:
+    """Links object files.
+
+    :param produce_pdb: Executable gets debug information. Without `debug_info_mode` it is
+        `/DEBUG:FASTLINK` with `/INCREMENTAL` (unless `fast_link` is `False`).
+    :param use_build_cache: Take static library from `htask.buildcache` when command line and inputs
+        are the same.
+    """
 
     if env is None:
         env = {}
@@ -283,12 +643,38 @@ def link(
     if output_debug_info_path is not None and output_kind != OutputKind.STATIC_LIBRARY:
         options.append(f"/Fd:{output_debug_info_path}")
 
-    options_formatted = " ".join(options)
+    if output_kind == OutputKind.EXECUTABLE:
+        # NOTE(gr3yknigh1): FASTLINK PDB refers to object files and can't be shipped, so it is used only when
+        # debug information was asked for. [2025/06/18]
+        if debug_info_mode is None and produce_pdb and fast_link:
+            debug_info_mode = DebugInfoMode.FASTLINK
+
+        if debug_info_mode is not None:
+            options.append(f"/DEBUG:{debug_info_mode!s}")
+
+            if fast_link and debug_info_mode != DebugInfoMode.NONE:
+                options.append("/INCREMENTAL")
+
+    options_formatted = " ".join(filter(None, options))
 
     if output_kind == OutputKind.EXECUTABLE:
         result = c.run(f"link.exe /nologo {options_formatted}", env=env, **kw)
     elif output_kind == OutputKind.STATIC_LIBRARY:
-        result = c.run(f"lib.exe /nologo /OUT:{output} {options_formatted}", env=env, **kw)
+        command = f"lib.exe /nologo /OUT:{output} {options_formatted}"
+
+        if not use_build_cache or c.config.dry_run:
+            return c.run(command, env=env, **kw)
+
+        toolset = get_toolset_key("lib.exe", env, ("LIB",), inherit_env=kw.get("inherit_env", True))
+        build_cache_key = buildcache.compute_key(f"{toolset} {command}", [*object_files, *libraries])
+
+        if buildcache.try_hit(build_cache_key, [output]):
+            return Result(return_code=0, output=None)
+
+        result = c.run(command, env=env, **kw)
+
+        if result.return_code == 0:
+            buildcache.store(build_cache_key, [output])
     elif output_kind == OutputKind.DYNAMIC_LIBRARY:
         result = c.run(f"cl.exe /nologo /LD /Fe:{output} {options_formatted}", env=env, **kw)
     else:
@@ -300,6 +686,19 @@ def link(
 def show_includes(
     c: Context,
     source_file: str,
+    **kw,
+) -> list[str]:
+    """Returns list of header-files on which given source file is dependent.
+
+    Check `show_includes_many` for the options.
+    """
+
+    return show_includes_many(c, [source_file], **kw)[source_file]
+
+
+def show_includes_many(
+    c: Context,
+    sources: list[str],
     *,
     includes: list[str] | None = None,
     macros: dict[str, str] | None = None,
@@ -307,8 +706,10 @@ def show_includes(
     exception_handle: ExceptionHandle | None = None,
     env: dict[str, str] | None=None,
     **kw,
-) -> list[str]:
-    """Returns list of header-files on which given source file is dependent.
+) -> dict[str, list[str]]:
+    """Returns header-files on which each of given source files is dependent.
+
+    All sources are scanned with single `cl.exe` invocation.
 
     :param includes: List of directories which should be added to include PATH.
 
@@ -323,44 +724,58 @@ def show_includes(
     if macros is None:
         macros = {}
 
-    options = []
-
+    # NOTE(gr3yknigh1): All parts of the command are collected in one list and joined once. [2025/06/18]
+    parts = ["cl.exe", "/Zs", "/nologo"]
 
     if exception_handle is not None:
-        exception_handle_flag = EXCEPTION_HANDLE_TO_FLAG[exception_handle]
-        options.append(exception_handle_flag)
+        parts.append(EXCEPTION_HANDLE_TO_FLAG[exception_handle])
 
     if language_standard is not None:
-        options.append(f"/std:{language_standard!s}")
+        parts.append(f"/std:{language_standard!s}")
 
-    if len(macros.keys()) > 0:
-        options.append(format_defines(macros))
+    parts.extend(f"/D {k}={v}" for k, v in macros.items())
+    parts.extend(f"/I {include}" for include in includes)
+    parts.append("/showIncludes")
+    parts.extend(sources)
 
-    if len(includes) > 0:
-        options.append(format_includes(includes))
+    prefix = SHOW_INCLUDES_PREFIX
+    prefix_length = len(prefix)
 
-    options_formatted = " ".join(options)
+    # NOTE(gr3yknigh1): `cl.exe` handles sources in the given order and prints name of each of them
+    # before it's includes, so these names split the output. `/MP` is not used here, because it mixes
+    # the output of the sources. [2025/06/18]
+    source_names = [os.path.basename(source_file) for source_file in sources]
+    include_files: list[list[str]] = [[] for _ in sources]
+    failed_lines = []
+    current = 0
 
-    result = c.run(f"cl.exe /Zs {options_formatted} /showIncludes {source_file}", env=env, capture_output=True, **kw)
-    assert result.output is not None
+    # NOTE(gr3yknigh1): Output of `/showIncludes` can be huge, so it is parsed line by line while
+    # compiler is running instead of being buffered. [2025/06/18]
+    def on_line(line: str) -> None:
+        nonlocal current
 
-    prefix = "Note: including file:"
+        if not line.startswith(prefix):
 
-    include_files = []
+            if current + 1 < len(sources) and line.strip() == source_names[current + 1]:
+                current += 1
+            elif "error" in line or "warning" in line:
+                failed_lines.append(line)
 
-    for line in result.output.split("\n"):
-        if not line.startswith(prefix):
+            return
+        include_files[current].append(line[prefix_length:].strip())
+
+    c.run(" ".join(parts), env=env, on_line=on_line, **kw)
 
-            if "error" in line or "warning" in line:
-                raise Exception(f"Failed to retrive include files for source file! source={source_file} line={line!r}")
+    if len(failed_lines) > 0:
+        raise Exception(f"Failed to retrive include files for source files! sources={sources} line={failed_lines[0]!r}")
 
-            continue
-        line = line.replace(prefix, "", 1)
-        line = line.strip()
+    return dict(zip(sources, include_files))
 
-        assert c.exists(line)
-        include_files.append(line)
 
-    return include_files
+def read_source_dependencies(file: str) -> list[str]:
+    """Returns header-files from JSON which is produced by `/sourceDependencies` option."""
 
+    with open(file, "r", encoding="utf-8") as f:
+        dependencies = json.load(f)
 
+    return list(dependencies["Data"]["Includes"])
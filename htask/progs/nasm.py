@@ -3,15 +3,22 @@ from typing import Sequence
 from typing import Optional
 
 import sys
+import os
 import os.path
 
+from concurrent.futures import ThreadPoolExecutor
 
-from htask import Context
+from htask import Context, Result
+from htask import buildcache
 
 
 __all__ = ("assemble",)
 
 
+DEFAULT_OUTPUT_FORMAT: str | None
+DEFAULT_DEBUG_FORMAT: str | None
+OBJECT_FILE_EXT: str | None
+
 if sys.platform == "win32":
     # TODO: Check for bitness
     DEFAULT_OUTPUT_FORMAT = "win64"
@@ -24,9 +31,18 @@ elif sys.platform == "linux":
     DEFAULT_DEBUG_FORMAT = "dwarf"
     OBJECT_FILE_EXT = "o"
 
+elif sys.platform == "darwin":
+    # TODO: Check for bitness
+    DEFAULT_OUTPUT_FORMAT = "macho64"
+    DEFAULT_DEBUG_FORMAT = "dwarf"
+    OBJECT_FILE_EXT = "o"
+
 else:
-    # TODO: Make better exception
-    raise Exception(f"Unsupported platform: {sys.platform!r}.")
+    # NOTE(gr3yknigh1): Module stays importable, platform is checked only when something is assembled.
+    # [2025/06/18]
+    DEFAULT_OUTPUT_FORMAT = None
+    DEFAULT_DEBUG_FORMAT = None
+    OBJECT_FILE_EXT = None
 
 
 def assemble(
@@ -36,24 +52,71 @@ def assemble(
     output: Optional[str]=None,
     output_format=DEFAULT_OUTPUT_FORMAT,
     debug_format=DEFAULT_DEBUG_FORMAT,
-):
+    launcher: Optional[str]=None,
+    use_build_cache=False,
+) -> list[Result]:
+    """Assembles every source into it's own object file, in parallel.
+
+    :param output: Folder for object files or, for single source, path of the object file. Current directory
+        by default.
+    :param launcher: Command to run NASM with, for example `sccache`.
+    :param use_build_cache: Take object files from `htask.buildcache` when command line and source are the
+        same.
+
+    Sources whose object file is newer than the source are skipped. Files included by sources are not
+    tracked.
+    """
     # TODO: Make more options and make NASM.EXE discovery like in cmake wrapper.
     # TODO: Make debug optional
 
     if len(sources) == 0:
         raise Exception("No sources was provided!") # TODO: Make error printing with htask API 
 
-    file_name, file_ext = os.path.splitext(
-        os.path.basename(sources[0])
-    )
+    if OBJECT_FILE_EXT is None or output_format is None or debug_format is None:
+        # TODO: Make better exception
+        raise Exception(f"Unsupported platform: {sys.platform!r}.")
 
     if output is None:
-        output = c.join(c.cwd(), f"{file_name}.{OBJECT_FILE_EXT}")
-    elif os.path.isdir(output):
-        output = c.join(output, f"{file_name}.{OBJECT_FILE_EXT}")
+        output = c.cwd()
+
+    output_is_dir = os.path.isdir(output)
+
+    if not output_is_dir and len(sources) > 1:
+        raise Exception(f"Output should be a folder for multiple sources! output={output!r}")
+
+    def assemble_source(source: str) -> Result:
+        if output_is_dir:
+            file_name, _ = os.path.splitext(os.path.basename(source))
+            source_output = c.join(output, f"{file_name}.{OBJECT_FILE_EXT}")
+        else:
+            source_output = output
+
+        try:
+            if os.path.getmtime(source_output) >= os.path.getmtime(source):
+                return Result(return_code=0, output=None)
+        except OSError:
+            pass
+
+        command = f"nasm -f {output_format} -g -F {debug_format} {source} -o {source_output}"
+
+        if launcher is not None:
+            command = f"{launcher} {command}"
+
+        if not use_build_cache or c.config.dry_run:
+            return c.run(command)
+
+        build_cache_key = buildcache.compute_key(command, [source])
+
+        if buildcache.try_hit(build_cache_key, [source_output]):
+            return Result(return_code=0, output=None)
+
+        result = c.run(command)
 
-    sources_formatted = " ".join(sources)
+        if result.return_code == 0:
+            buildcache.store(build_cache_key, [source_output])
 
-    return c.run(f"nasm -f {output_format} -g -F {debug_format} {sources_formatted} -o {output}")
-    
+        return result
 
+    # NOTE(gr3yknigh1): NASM assembles single file per process, so sources are spread over processes. [2025/06/18]
+    with ThreadPoolExecutor(max_workers=max(1, min(len(sources), os.cpu_count() or 1))) as executor:
+        return list(executor.map(assemble_source, sources))
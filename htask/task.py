@@ -1,17 +1,24 @@
 from __future__ import annotations
 from typing import Callable, Any
+from typing import Iterable
+from typing import Awaitable
+from typing import TypeVar
 
 from dataclasses import dataclass
 from dataclasses import field
 from contextlib import contextmanager
-from copy import deepcopy
 import subprocess
+import asyncio
 import shlex
+import shutil
+import functools
 import os
 import sys
 
 __all__ = ("Task", "define_task", "Result", "Config")
 
+Ty = TypeVar("Ty")
+
 
 @dataclass
 class Task:
@@ -19,6 +26,9 @@ class Task:
     name: str
     required_programs: list[str] = field(default_factory=list)
 
+    # NOTE(gr3yknigh1): Names of tasks which should be finished before this one. [2025/06/18]
+    depends_on: list[str] = field(default_factory=list)
+
 
 
 
@@ -28,11 +38,61 @@ class Config:
     echo: bool = field(default=True)
 
 
+# NOTE(gr3yknigh1): Commands which use these are executed through the shell. Everything else is spawned
+# directly, without `cmd.exe` process in between. [2025/06/18]
+SHELL_OPERATORS = frozenset({"&&", "||", "|", ">", ">>", "<"})
+WINDOWS_SHELL_BUILTINS = frozenset({"echo", "mkdir", "md", "rmdir", "rd", "del", "erase", "copy", "move", "set", "type", "dir"})
+
+
+# NOTE(gr3yknigh1): The same commands are issued many times during the build (e.g. per source), so they
+# are tokenized once. [2025/06/18]
+@functools.lru_cache(maxsize=2048)
+def _split(command: str, posix: bool) -> tuple[str, ...]:
+    return tuple(shlex.split(command, posix=posix))
+
+
+def _get_path(env: dict[str, Any]) -> str | None:
+    """Returns PATH of the environment. Names of variables are case insensitive on Windows."""
+
+    for name, value in env.items():
+        if name.upper() == "PATH":
+            return value
+    return None
+
+
+def _replace_program(command_line: str, program: str) -> str:
+    """Replaces first (possibly quoted) token of the command line with the program."""
+
+    command_line = command_line.lstrip()
+
+    if command_line.startswith("\""):
+        end = command_line.find("\"", 1)
+        rest = command_line[end + 1 :] if end != -1 else ""
+    else:
+        _, _, rest = command_line.partition(" ")
+        rest = f" {rest}" if rest else ""
+
+    return subprocess.list2cmdline([program]) + rest
+
+
+def _list_folder(folder: str) -> frozenset[str] | None:
+    """Returns names of entries of the folder (normalized case) or `None` if folder can't be listed."""
+
+    try:
+        with os.scandir(folder) as entries:
+            return frozenset(os.path.normcase(entry.name) for entry in entries)
+    except OSError:
+        return None
+
+
 @dataclass
 class Result:
     return_code: int
     output: str | None
 
+    # NOTE(gr3yknigh1): Captured output as is, before decoding. [2025/06/18]
+    raw_output: bytes | None = field(default=None)
+
 
 @dataclass
 class Context:
@@ -54,6 +114,32 @@ class Context:
     def exists(self, p: str):
         return os.path.exists(p)
 
+    def exists_many(self, paths: Iterable[str]) -> list[bool]:
+        """Checks existence of many files at once (like `os.path.lexists`).
+
+        Every folder is listed once with `os.scandir` instead of stat-ing each of it's files. Listings are
+        not kept after the call.
+        """
+
+        listings: dict[str, frozenset[str] | None] = {}
+        result: list[bool] = []
+
+        for p in paths:
+            folder, name = os.path.split(os.path.normcase(os.path.abspath(p)))
+
+            # NOTE(gr3yknigh1): Root of the drive has no folder to look into. [2025/06/18]
+            if not name:
+                result.append(os.path.lexists(p))
+                continue
+
+            listing = listings.get(folder, ...)
+            if listing is ...:
+                listing = listings[folder] = _list_folder(folder)
+
+            result.append(listing is not None and name in listing)
+
+        return result
+
     def join(self, *parts: str) -> str:
         return os.path.join(*parts)
 
@@ -65,66 +151,134 @@ class Context:
         capture_output=False,
         quiet=False,
         env: dict[str, Any] | None = None,
+        on_line: Callable[[str], None] | None = None,
+        inherit_env=True,
     ) -> Result:
         """Execute shell command.
 
         :param quiet: Overrides `self.confg.echo` for this call.
+        :param encoding: Encoding of captured output. If `None`, output is not decoded and only
+            `Result.raw_output` is set.
+        :param inherit_env: When `False`, `env` is used as complete environment of the process instead of being
+            merged into `os.environ`. Lets callers build environment once for many processes.
+        :param on_line: Called for every line of standard output as soon as it is produced. Output is
+            not accumulated in this case and `Result.output` is `None`.
         """
 
-        parts = [*self.prefixes, *shlex.split(command, posix=sys.platform != "win32")]
+        parts = [*self.prefixes, *_split(command, sys.platform != "win32")]
         parts[0] = self.dequote(parts[0])
 
-        if env is None:
+        shell = any(part in SHELL_OPERATORS for part in parts) or (
+            sys.platform == "win32" and parts[0].lower() in WINDOWS_SHELL_BUILTINS
+        )
+
+        # NOTE(gr3yknigh1): Without extra variables the process inherits environment by itself, so nothing is
+        # copied. Otherwise they are merged into current `os.environ`, which tasks may change. [2025/06/18]
+        if inherit_env:
+            if env:
+                env = {**os.environ, **env}
+            else:
+                env = None
+        elif env is None:
             env = {}
 
-        env = {**os.environ, **env}
+        # NOTE(gr3yknigh1): On Windows process takes single command line anyway, so it is passed as is and
+        # keeps its quoting. [2025/06/18]
+        args: str | list[str] = parts
+        if shell or sys.platform == "win32":
+            args = " ".join([*self.prefixes, command])
+
+        # NOTE(gr3yknigh1): `CreateProcess` looks the program up on PATH of this process, not on PATH of
+        # `env` (e.g. one from vcvars). So without `env` command still goes through `cmd.exe`, and with it
+        # the program is resolved here. [2025/06/18]
+        if sys.platform == "win32" and not shell:
+            program = None
+            if env is not None:
+                program = shutil.which(parts[0], path=_get_path(env))
+
+            if program is None:
+                shell = True
+            else:
+                assert isinstance(args, str)
+                args = _replace_program(args, program)
 
         if (self.config.dry_run or self.config.echo) and not quiet:
             print(f"> {' '.join(parts)}", flush=True)
 
         output: str | None = None
+        raw_output: bytes | None = None
         return_code = 0
 
         if not self.config.dry_run:
-            if capture_output:
+            if on_line is not None:
                 process = subprocess.Popen(
-                    parts,
-                    shell=True,
+                    args,
+                    shell=shell,
                     stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
                     env=env,
                     cwd=self.root,
                 )
-                stdout, _ = process.communicate(timeout=timeout)
-                output = (
-                    stdout.decode(encoding) if stdout is not None else None
-                )
+                assert process.stdout is not None
+
+                with process.stdout:
+                    for line in process.stdout:
+                        on_line(line.decode(encoding, errors="replace").rstrip("\r\n"))
+
+                process.wait(timeout=timeout)
+                return_code = process.returncode
             else:
-                process = subprocess.Popen(
-                    parts, 
-                    shell=True,
+                completed = subprocess.run(
+                    args,
+                    shell=shell,
+                    capture_output=capture_output,
                     env=env,
                     cwd=self.root,
+                    timeout=timeout,
+                    check=False,
                 )
-                process.wait(timeout=timeout)
+                return_code = completed.returncode
 
-            return_code = process.returncode
+                if capture_output:
+                    raw_output = completed.stdout
+                    output = (
+                        raw_output.decode(encoding) if raw_output is not None and encoding is not None else None
+                    )
 
         return Result(
             return_code=return_code,
             output=output,
+            raw_output=raw_output,
         )
 
+    async def run_async(self, command: str, **kw) -> Result:
+        """Execute shell command without blocking the event loop. Takes the same options as `run`.
+
+        Lets orchestration code run many compiler invocations at once, check `gather`.
+        """
+
+        # NOTE(gr3yknigh1): Process is waited in worker thread instead of `asyncio.create_subprocess_exec`,
+        # since the latter re-quotes command line on Windows and `run` passes it as is. [2025/06/18]
+        return await asyncio.to_thread(self.run, command, **kw)
+
+    async def gather(self, *coros: Awaitable[Ty], limit: int | None = None) -> list[Ty]:
+        """Awaits all coroutines, at most `limit` (number of CPUs by default) of them at once."""
+
+        semaphore = asyncio.Semaphore(limit or os.cpu_count() or 1)
+
+        async def limited(coro: Awaitable[Ty]) -> Ty:
+            async with semaphore:
+                return await coro
+
+        return list(await asyncio.gather(*(limited(coro) for coro in coros)))
+
     def cwd(self) -> str:
         return os.getcwd()
 
     @contextmanager
     def prefix(self, prefix: str):
-        prefixes = deepcopy(self.prefixes)
-        prefixes.append(prefix)
-
         try:
-            yield Context(self.root, prefixes, self.config)
+            yield Context(self.root, [*self.prefixes, prefix], self.config)
         finally:
             pass
 
@@ -162,9 +316,10 @@ def define_task(
     *,
     name: str | None = None,
     required_programs: list[str] | None = None,
+    depends_on: list[str] | None = None,
 ):
     def internal_task_procedure(task_procedure: Callable) -> Callable:
-        nonlocal required_programs, name
+        nonlocal required_programs, name, depends_on
 
         if name is None:
             name = task_procedure.__name__
@@ -172,10 +327,14 @@ def define_task(
         if required_programs is None:
             required_programs = []
 
+        if depends_on is None:
+            depends_on = []
+
         task = Task(
             procedure=task_procedure,
             name=name,
             required_programs=required_programs,
+            depends_on=depends_on,
         )
 
         orphan_tasks.append(task)
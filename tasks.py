@@ -1,10 +1,12 @@
 from typing import Any
 
 from os import getcwd, getenv
-from os.path import exists, join, dirname
+from os.path import exists, join, dirname, getmtime
 import subprocess
+import json
+import os
 
-from invoke import task, Context
+from invoke import task, Context, Exit
 
 project_folder = dirname(__file__)
 dist_folder = join(project_folder, "dist")
@@ -27,17 +29,36 @@ def extract_env_from_venv_activation_script(
     env_activation_script: str,
     environment_vars: list[str],
 ) -> dict[str, Any]:
+    # NOTE(gr3yknigh1): Environment is cached next to the script until the script changes, so each task
+    # doesn't spawn `cmd.exe` again. [2025/06/18]
+    cache_file = f"{env_activation_script}.env.json"
+    script_mtime = getmtime(env_activation_script)
+
+    if exists(cache_file):
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+
+        if cached.get("mtime") == script_mtime and cached.get("vars") == environment_vars:
+            return cached["env"]
+
     process = subprocess.Popen(
         [env_activation_script, "&&", "set"], stdout=subprocess.PIPE
     )
-    output = process.stdout.read().decode("utf-8")
+    # NOTE(gr3yknigh1): `cmd.exe` writes output of `set` in OEM code page. [2025/06/18]
+    output = process.stdout.read().decode("oem", errors="replace")
+
+    # NOTE(gr3yknigh1): Values may contain `=` too, so line is split on the first one only. [2025/06/18]
+    keep = frozenset(var.upper() for var in environment_vars)
+    env = {}
+
+    for line in output.splitlines():
+        name, separator, value = line.partition("=")
+        if separator and (name := name.upper()) in keep:
+            env[name] = value
 
-    # NOTE(gr3yknigh1): Ha-ha, nasty, but it is on purpose! [2025/02/03]
-    env = {
-        item[0].upper(): item[1]
-        for item in (line.split("=") for line in output.splitlines())
-        if len(item) == 2 and item[0].upper() in environment_vars
-    }
+    with open(f"{cache_file}.tmp", "w", encoding="utf-8") as f:
+        json.dump({"mtime": script_mtime, "vars": environment_vars, "env": env}, f)
+    os.replace(f"{cache_file}.tmp", cache_file)
 
     return env
 
@@ -78,6 +99,17 @@ def lint(c: Context) -> None:
     activate_bat = join(env_path, "Scripts", "activate.bat")
     env = extract_env_from_venv_activation_script(activate_bat, env_vars)
 
-    c.run(f"mypy {' '.join(sources)}", env=env)
-    c.run(f"ruff check --respect-gitignore {' '.join(sources)}", env=env)
-    c.run(f"ruff format --respect-gitignore --check --diff {' '.join(sources)}", env=env)
+    # NOTE(gr3yknigh1): Linters don't depend on each other, so they are run at the same time. [2025/06/18]
+    promises = [
+        c.run(command, env=env, warn=True, asynchronous=True)
+        for command in (
+            f"mypy {' '.join(sources)}",
+            f"ruff check --respect-gitignore {' '.join(sources)}",
+            f"ruff format --respect-gitignore --check --diff {' '.join(sources)}",
+        )
+    ]
+    results = [promise.join() for promise in promises]
+    failed_commands = [result.command for result in results if result.failed]
+
+    if len(failed_commands) > 0:
+        raise Exit(f"Linters failed! commands={failed_commands!r}", code=1)
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import threading
+
+from htask import buildcache
+
+
+def test_concurrent_hits_of_the_same_output(tmp_path, monkeypatch):
+    monkeypatch.setenv("HTASK_CACHE_DIR", str(tmp_path / "cache"))
+
+    output = tmp_path / "a.obj"
+    output.write_bytes(b"object" * 1024)
+
+    key = buildcache.compute_key("cl.exe /c a.c", [])
+    buildcache.store(key, [str(output)])
+    output.unlink()
+
+    barrier = threading.Barrier(8, timeout=5)
+    results: list[bool] = []
+
+    def hit() -> None:
+        barrier.wait()
+        results.append(buildcache.try_hit(key, [str(output)]))
+
+    threads = [threading.Thread(target=hit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [True] * 8
+    assert output.read_bytes() == b"object" * 1024
+    assert [path.name for path in tmp_path.iterdir() if path.name.endswith(".tmp")] == []
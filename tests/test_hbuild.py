@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import os
+
+from hbuild import Architecture, BuildType, Compiler, Configuration
+
+
+def make_configuration(tmp_path) -> Configuration:
+    return Configuration(
+        prefix=str(tmp_path / "build"),
+        build_file=str(tmp_path / "build.py"),
+        compiler=Compiler.MSVC,
+        build_type=BuildType.DEBUG,
+        architecture=Architecture.X86_64,
+    )
+
+
+def test_compiler_environment_block_has_only_compiler_variables(tmp_path, monkeypatch):
+    monkeypatch.delenv("LIB", raising=False)
+    monkeypatch.delenv("LIBPATH", raising=False)
+
+    conf = make_configuration(tmp_path)
+    conf._environment_loader = lambda: {"INCLUDE": "inc", "LIB": "lib", "LIBPATH": "libpath", "PATH": "path"}
+
+    block = conf.get_compiler_environment_block()
+
+    assert block["INCLUDE"] == "inc"
+    assert block["PATH"] == "path"
+    assert "LIB" not in block
+    assert "LIBPATH" not in block
+    assert conf.get_environment_block()["LIB"] == "lib"
+    assert block.keys() >= os.environ.keys() - {"INCLUDE", "PATH"}
+
+
+def test_source_tree_hash_is_of_the_project_folder(tmp_path):
+    import subprocess
+
+    from htask import Config, Context
+    from hbuild import get_source_tree_hash
+
+    def git(*args: str) -> None:
+        subprocess.run(["git", "-C", str(tmp_path), *args], check=True, capture_output=True)
+
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a" / "build.py").write_text("a")
+    (tmp_path / "b" / "build.py").write_text("b")
+
+    git("init", "-q")
+    git("add", ".")
+    git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "init")
+
+    c = Context(str(tmp_path), config=Config(echo=False))
+
+    tree_a = get_source_tree_hash(c, str(tmp_path / "a"))
+    tree_b = get_source_tree_hash(c, str(tmp_path / "b"))
+
+    assert tree_a is not None and tree_b is not None
+    assert tree_a != tree_b
+
+    (tmp_path / "b" / "build.py").write_text("changed")
+
+    assert get_source_tree_hash(c, str(tmp_path / "a")) == tree_a
+    assert get_source_tree_hash(c, str(tmp_path / "b")) is None
+
+
+def test_source_tree_hash_without_git(tmp_path, monkeypatch):
+    from htask import Config, Context
+    from hbuild import get_source_tree_hash
+
+    monkeypatch.setenv("PATH", str(tmp_path))
+
+    assert get_source_tree_hash(Context(str(tmp_path), config=Config(echo=False)), str(tmp_path)) is None
+
+
+def test_tree_cache_is_keyed_by_build_file(tmp_path):
+    from hbuild import TargetProperties
+
+    cache_file = str(tmp_path / "cache.db")
+
+    parent = make_configuration(tmp_path)
+    child = Configuration(
+        prefix=parent.prefix,
+        build_file=str(tmp_path / "child" / "build.py"),
+        compiler=parent.compiler,
+        build_type=parent.build_type,
+        architecture=parent.architecture,
+    )
+
+    child.save_tree_cache(cache_file, "tree", TargetProperties(includes=["child"]))
+
+    assert parent.load_tree_cache(cache_file, "tree") is None
+    assert child.load_tree_cache(cache_file, "tree") == TargetProperties(includes=["child"])
+
+
+def test_file_cache_keeps_entries_of_other_projects(tmp_path):
+    cache_file = str(tmp_path / "files.pickle")
+
+    child = make_configuration(tmp_path)
+    child._file_digests["child.h"] = (1, 1, b"child")
+    child.save_file_cache(cache_file)
+
+    parent = make_configuration(tmp_path)
+    parent._file_digests["parent.h"] = (2, 2, b"parent")
+    parent.save_file_cache(cache_file)
+
+    loaded = make_configuration(tmp_path)
+    loaded.load_file_cache(cache_file)
+
+    assert loaded._file_digests == {"child.h": (1, 1, b"child"), "parent.h": (2, 2, b"parent")}
+
+
+def compile_with_fake_msvc(tmp_path, monkeypatch, sources: list[str], missing: list[str] = []) -> list[dict]:
+    """Compiles static library from the sources, recording options of every `msvc.compile` call."""
+
+    from htask import Context, Result
+    from htask.progs import msvc
+    from hbuild import Language, NullReporter, Package, SourceFile, Target, TargetKind, _compile_single_target
+
+    calls: list[dict] = []
+
+    def compile(c, sources, **kw) -> Result:
+        calls.append(dict(kw, sources=list(sources)))
+
+        if kw.get("output_dir") is not None:
+            outputs = [os.path.join(kw["output_dir"], f"{os.path.splitext(os.path.basename(s))[0]}.obj") for s in sources]
+        else:
+            outputs = [kw["output"]]
+
+        for output in outputs:
+            open(output, "w").close()
+        return Result(return_code=0, output=None)
+
+    def link(c, object_files, *, output, **kw) -> Result:
+        open(output, "w").close()
+        return Result(return_code=0, output=None)
+
+    monkeypatch.setattr(msvc, "compile", compile)
+    monkeypatch.setattr(msvc, "link", link)
+    monkeypatch.setattr(msvc, "read_source_dependencies", lambda file: [])
+
+    for source in sources:
+        if source in missing:
+            continue
+        (tmp_path / source).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / source).write_text("int x;")
+
+    conf = make_configuration(tmp_path)
+    conf._environment_loader = lambda: {}
+
+    target = Target("lib", TargetKind.STATIC_LIBRARY, sources=[SourceFile(source, Language.C) for source in sources])
+    _compile_single_target(
+        Context(str(tmp_path)),
+        conf=conf,
+        package=Package("p", [target]),
+        target=target,
+        reporter=NullReporter(),
+        compiled={},
+    )
+
+    return calls
+
+
+def test_debug_objects_get_pdb_of_the_target(tmp_path, monkeypatch):
+    calls = compile_with_fake_msvc(tmp_path, monkeypatch, ["a.c", "b.c"])
+
+    assert len(calls) == 1
+    assert calls[0]["output_debug_info_path"] == f"{calls[0]['output_dir']}\\"
+    assert calls[0]["output_dir"].endswith("lib")
+
+
+def test_sources_with_the_same_name_get_own_object_files(tmp_path, monkeypatch):
+    calls = compile_with_fake_msvc(tmp_path, monkeypatch, ["x/util.c", "y/util.c", "main.c"])
+
+    batched = [call for call in calls if call["output_dir"] is not None]
+    single = [call for call in calls if call["output_dir"] is None]
+
+    assert [os.path.basename(source) for call in batched for source in call["sources"]] == ["main.c"]
+    assert len(single) == 2
+    assert len({call["output"] for call in single}) == 2
+    assert all(os.path.basename(call["output"]).startswith("util.") for call in single)
+    assert len({call["source_dependencies"] for call in single}) == 2
+
+
+def test_mp_processes_are_taken_from_shared_budget(tmp_path, monkeypatch):
+    from hbuild import JobSlots
+
+    monkeypatch.setattr(Configuration, "get_job_slots", lambda self: slots)
+
+    slots = JobSlots(3)
+    calls = compile_with_fake_msvc(tmp_path, monkeypatch, ["a.c", "b.c", "c.c", "d.c"])
+    assert calls[0]["mp_processes"] == 3
+
+    slots = JobSlots(3)
+    assert slots.acquire(2) == 2
+    calls = compile_with_fake_msvc(tmp_path, monkeypatch, ["a.c", "b.c", "c.c", "d.c"])
+    assert calls[0]["mp_processes"] is None
+    slots.release(2)
+
+    assert slots.acquire(10) == 3
+
+
+
+def test_missing_sources_are_reported(tmp_path, monkeypatch):
+    import pytest
+
+    with pytest.raises(Exception, match="gone.c"):
+        compile_with_fake_msvc(tmp_path, monkeypatch, ["a.c", "gone.c"], missing=["gone.c"])
+
+
+def test_many_changed_files_are_hashed_by_worker_processes(tmp_path, monkeypatch):
+    import hbuild
+
+    monkeypatch.setattr(hbuild, "HBUILD_HASH_PROCESS_POOL_THRESHOLD", 3)
+
+    sources = []
+    for index in range(3):
+        source = tmp_path / f"{index}.c"
+        source.write_text(f"int x{index};")
+        sources.append(str(source))
+
+    header = tmp_path / "a.h"
+    header.write_text("int a;")
+
+    conf = make_configuration(tmp_path)
+    conf.set_include_files(sources[0], b"options", [str(header)])
+    conf._file_digests.clear()
+    conf._file_stats.clear()
+
+    conf.prefetch_file_digests(sources)
+
+    assert {file: digest for file, (_, _, digest) in conf._file_digests.items()} == {
+        file: hbuild.compute_file_digest(file) for file in [*sources, str(header)]
+    }
+
+
+def compile_targets_with(tmp_path, monkeypatch, root, compile_one) -> list[str]:
+    """Runs scheduler of targets with `compile_one(target)` instead of the compiler."""
+
+    import hbuild
+
+    calls: list[str] = []
+
+    def compile_single_target(c, *, conf, package, target, reporter, compiled):
+        for link in hbuild.get_target_links(target):
+            assert id(link) in compiled
+        compile_one(target)
+        calls.append(target.name)
+        return hbuild.TargetProperties()
+
+    monkeypatch.setattr(hbuild, "_compile_single_target", compile_single_target)
+
+    hbuild.compile_targets(
+        None,
+        conf=make_configuration(tmp_path),
+        roots=[(root, hbuild.Package("p", [root]))],
+        reporter=hbuild.NullReporter(),
+    )
+    return calls
+
+
+def make_targets(links: dict[str, list[str]]):
+    from hbuild import Access, Target, TargetKind
+
+    targets = {name: Target(name, TargetKind.STATIC_LIBRARY) for name in links}
+    for name, names in links.items():
+        targets[name].properties[Access.PUBLIC].links.extend(targets[link] for link in names)
+    return targets
+
+
+def test_targets_are_compiled_after_their_links(tmp_path, monkeypatch):
+    targets = make_targets({"app": ["b", "c"], "b": ["d"], "c": ["d"], "d": []})
+
+    calls = compile_targets_with(tmp_path, monkeypatch, targets["app"], lambda target: None)
+
+    assert sorted(calls) == ["app", "b", "c", "d"]
+    assert calls[0] == "d" and calls[-1] == "app"
+
+
+def test_longest_chain_is_started_first(tmp_path, monkeypatch):
+    import hbuild
+
+    monkeypatch.setattr(hbuild.os, "cpu_count", lambda: 1)
+    targets = make_targets({"app": ["leaf", "chain"], "chain": ["chain_leaf"], "leaf": [], "chain_leaf": []})
+
+    calls = compile_targets_with(tmp_path, monkeypatch, targets["app"], lambda target: None)
+
+    assert calls[0] == "chain_leaf"
+
+
+def test_failed_target_stops_its_dependents(tmp_path, monkeypatch):
+    import pytest
+
+    targets = make_targets({"app": ["lib"], "lib": []})
+    started: list[str] = []
+
+    def compile_one(target) -> None:
+        started.append(target.name)
+        if target.name == "lib":
+            raise Exception("Failed to compile!")
+
+    with pytest.raises(Exception, match="Failed to compile!"):
+        compile_targets_with(tmp_path, monkeypatch, targets["app"], compile_one)
+
+    assert started == ["lib"]
+
+
+def test_circular_links_are_detected(tmp_path, monkeypatch):
+    import pytest
+
+    targets = make_targets({"app": ["a"], "a": ["b"], "b": ["a"]})
+
+    with pytest.raises(Exception, match="circular dependency"):
+        compile_targets_with(tmp_path, monkeypatch, targets["app"], lambda target: None)
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from hpipe import errors
+from hpipe.pipeline import Pipeline, execute_pipeline
+
+
+def make_pipeline(*stages: str) -> Pipeline:
+    pipeline = Pipeline(max_parallel=4)
+    pipeline.define_stages(*stages)
+    return pipeline
+
+
+def test_jobs_wait_for_previous_stages_and_producers():
+    pipeline = make_pipeline("build", "test")
+    calls: list[str] = []
+    lock = threading.Lock()
+
+    def add_job(name: str, stage: str, **kw) -> None:
+        @pipeline.define_job(stage=stage, **kw)
+        def job(c) -> None:
+            with lock:
+                calls.append(name)
+
+    add_job("tests", "test")
+    add_job("app", "build", consumes=["lib"])
+    add_job("lib", "build", produces=["lib"])
+
+    execute_pipeline(pipeline)
+
+    assert calls.index("lib") < calls.index("app") < calls.index("tests")
+
+
+def test_failed_job_stops_the_pipeline():
+    pipeline = make_pipeline("build", "test")
+    calls: list[str] = []
+
+    @pipeline.define_job(stage="build")
+    def build(c) -> None:
+        raise RuntimeError("compiler crashed")
+
+    @pipeline.define_job(stage="test")
+    def test(c) -> None:
+        calls.append("test")
+
+    with pytest.raises(errors.PipelineFailed) as info:
+        execute_pipeline(pipeline)
+
+    assert [job.handler for job in info.value.failed_jobs] == [build]
+    assert [job.handler for job in info.value.skipped_jobs] == [test]
+    assert calls == []
+
+
+def test_circular_dependency_is_detected():
+    pipeline = make_pipeline("build")
+
+    @pipeline.define_job(stage="build", produces=["a"], consumes=["b"])
+    def a(c) -> None:
+        pass
+
+    @pipeline.define_job(stage="build", produces=["b"], consumes=["a"])
+    def b(c) -> None:
+        pass
+
+    with pytest.raises(errors.CircularDependency):
+        execute_pipeline(pipeline)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import sys
+
+from htask import Config, Context
+
+
+def test_run_sees_changes_of_os_environ(tmp_path, monkeypatch):
+    c = Context(str(tmp_path), config=Config(echo=False))
+    command = f'"{sys.executable}" -c "import os; print(os.environ[\'HTASK_TEST\'])"'
+
+    monkeypatch.setenv("HTASK_TEST", "first")
+    assert c.run(command, env={"OTHER": "1"}, capture_output=True).output.strip() == "first"
+
+    monkeypatch.setenv("HTASK_TEST", "second")
+    assert c.run(command, env={"OTHER": "1"}, capture_output=True).output.strip() == "second"
+    assert c.run(command, capture_output=True).output.strip() == "second"
+
+
+def test_exists_sees_files_written_outside_of_context(tmp_path):
+    c = Context(str(tmp_path), config=Config(echo=False))
+    file = tmp_path / "file.txt"
+
+    assert not c.exists(str(file))
+    file.write_text("")
+    assert c.exists(str(file))
+    file.unlink()
+    assert not c.exists(str(file))
+
+
+def test_exists_many(tmp_path):
+    c = Context(str(tmp_path), config=Config(echo=False))
+    (tmp_path / "a.h").write_text("")
+
+    assert c.exists_many([str(tmp_path / "a.h"), str(tmp_path / "b.h"), str(tmp_path / "x" / "c.h")]) == [
+        True,
+        False,
+        False,
+    ]
+
+
+def test_dependencies_run_in_parallel_and_once(tmp_path):
+    import threading
+
+    from htask import Task
+    from htask.__main__ import run_tasks
+
+    calls: list[str] = []
+    barrier = threading.Barrier(2, timeout=5)
+
+    def make_task(name: str, depends_on: list[str] | None = None, wait: bool = False) -> Task:
+        def procedure(c) -> None:
+            if wait:
+                barrier.wait()
+            calls.append(name)
+
+        return Task(procedure=procedure, name=name, required_programs=["cl"], depends_on=depends_on or [])
+
+    tasks = [
+        make_task("a", wait=True),
+        make_task("b", wait=True),
+        make_task("lint", depends_on=["a", "b"]),
+    ]
+
+    run_tasks(Context(str(tmp_path)), ["lint", "a"], tasks, {"lint": {}, "a": {}}, max_workers=2)
+
+    assert sorted(calls[:2]) == ["a", "b"]
+    assert calls[2:] == ["lint"]
+
+
+def test_run_resolves_program_on_path_of_env_on_windows(tmp_path, monkeypatch):
+    import subprocess
+
+    from htask import task
+
+    calls: list[tuple[object, bool]] = []
+
+    def run(args, shell=False, **kw):
+        calls.append((args, shell))
+        return subprocess.CompletedProcess(args, 0)
+
+    def which(program, path=None):
+        return "C:\\Program Files\\VC\\cl.exe" if path == "C:\\Program Files\\VC" else None
+
+    monkeypatch.setattr(task.sys, "platform", "win32")
+    monkeypatch.setattr(task.subprocess, "run", run)
+    monkeypatch.setattr(task.shutil, "which", which)
+
+    c = Context(str(tmp_path), config=Config(echo=False))
+    c.run("cl.exe /c a.c", env={"Path": "C:\\Program Files\\VC"}, inherit_env=False)
+    c.run("cl.exe /c a.c")
+
+    assert calls == [('"C:\\Program Files\\VC\\cl.exe" /c a.c', False), ("cl.exe /c a.c", True)]
+
+
+def test_dependencies_get_default_arguments(tmp_path):
+    from htask import Task
+    from htask.__main__ import run_tasks
+
+    received: dict[str, object] = {}
+
+    def configure(c, build_type: str, verbose=False) -> None:
+        received.update(build_type=build_type, verbose=verbose)
+
+    def build(c) -> None:
+        pass
+
+    tasks = [
+        Task(procedure=configure, name="configure"),
+        Task(procedure=build, name="build", depends_on=["configure"]),
+    ]
+
+    run_tasks(Context(str(tmp_path)), ["build"], tasks, {"build": {}})
+
+    assert received == {"build_type": None, "verbose": False}
+
+
+def test_duplicate_tasks_are_reported_only_when_they_run(tmp_path):
+    import pytest
+
+    from htask import Task
+    from htask.__main__ import run_tasks
+
+    calls: list[str] = []
+
+    tasks = [
+        Task(procedure=lambda c: calls.append("build"), name="build", depends_on=["configure"]),
+        Task(procedure=lambda c: calls.append("configure"), name="configure"),
+        Task(procedure=lambda c: calls.append("clean"), name="clean"),
+        Task(procedure=lambda c: calls.append("clean"), name="clean"),
+    ]
+
+    run_tasks(Context(str(tmp_path)), ["build"], tasks, {"build": {}})
+    assert calls == ["configure", "build"]
+
+    with pytest.raises(Exception, match="same name"):
+        run_tasks(Context(str(tmp_path)), ["clean"], tasks, {"clean": {}})
+
+    tasks.append(Task(procedure=lambda c: None, name="configure"))
+
+    with pytest.raises(Exception, match="same name"):
+        run_tasks(Context(str(tmp_path)), ["build"], tasks, {"build": {}})
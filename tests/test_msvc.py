@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import os
+
+from htask import Context, Result
+from htask.progs import msvc
+
+
+def capture_commands(c: Context) -> list[str]:
+    commands: list[str] = []
+
+    def run(command: str, **kw) -> Result:
+        commands.append(command)
+        return Result(return_code=0, output=None)
+
+    c.run = run  # type: ignore[method-assign]
+    return commands
+
+
+def test_debug_info_is_embedded_only_with_launcher(tmp_path, monkeypatch):
+    monkeypatch.delenv("HTASK_COMPILER_LAUNCHER", raising=False)
+
+    c = Context(str(tmp_path))
+    commands = capture_commands(c)
+
+    options = dict(
+        output_dir=str(tmp_path),
+        output_kind=msvc.OutputKind.OBJECT_FILE,
+        only_compilation=True,
+        produce_pdb=True,
+        optimization_level=msvc.OptimizationLevel.DISABLED,
+    )
+    msvc.compile(c, ["a.c"], **options)
+    msvc.compile(c, ["a.c"], compiler_launcher="sccache", **options)
+
+    assert " /Zi " in commands[0] and " /Z7 " not in commands[0]
+    assert commands[1].startswith("sccache cl.exe") and " /Z7 " in commands[1]
+
+
+def test_extract_env_from_vcvars_tolerates_non_utf8_output(tmp_path):
+    c = Context(str(tmp_path))
+
+    def run(command: str, **kw) -> Result:
+        output = b"Path=C:\\Users\\J\xf6rg\\bin=x\r\nINCLUDE=inc\r\nOTHER=1\r\n"
+        return Result(return_code=0, output=None, raw_output=output)
+
+    c.run = run  # type: ignore[method-assign]
+
+    env = msvc.extract_env_from_vcvars(c, vcvars="vcvarsall.bat", extract_vars=["PATH", "INCLUDE"], use_cache=False)
+
+    assert env["INCLUDE"] == "inc"
+    assert env["PATH"].startswith("C:\\Users\\J") and env["PATH"].endswith("\\bin=x")
+    assert "OTHER" not in env
+
+
+def test_pdb_writes_are_serialized_without_mp(tmp_path, monkeypatch):
+    monkeypatch.delenv("HTASK_COMPILER_LAUNCHER", raising=False)
+
+    c = Context(str(tmp_path))
+    commands = capture_commands(c)
+
+    options = dict(output_dir=str(tmp_path), output_kind=msvc.OutputKind.OBJECT_FILE, only_compilation=True)
+    msvc.compile(c, ["a.c"], produce_pdb=True, **options)
+    msvc.compile(c, ["a.c"], produce_pdb=False, **options)
+    msvc.compile(c, ["a.c"], produce_pdb=True, compiler_launcher="sccache", **options)
+
+    assert " /Zi /FS " in commands[0]
+    assert " /FS " not in commands[1]
+    assert " /FS " not in commands[2]
+
+
+def test_sources_with_the_same_name_cant_share_output_folder(tmp_path):
+    import pytest
+
+    c = Context(str(tmp_path))
+    capture_commands(c)
+
+    with pytest.raises(Exception, match="same name"):
+        msvc.compile(
+            c,
+            [os.path.join("x", "util.c"), os.path.join("y", "util.c")],
+            output_dir=str(tmp_path),
+            output_kind=msvc.OutputKind.OBJECT_FILE,
+            only_compilation=True,
+        )
+
+
+def test_build_cache_takes_headers_from_the_compilation(tmp_path, monkeypatch):
+    monkeypatch.delenv("HTASK_COMPILER_LAUNCHER", raising=False)
+    monkeypatch.setenv("HTASK_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("INCLUDE", "first")
+
+    source = tmp_path / "a.c"
+    header = tmp_path / "a.h"
+    output = tmp_path / "a.obj"
+    source.write_text('#include "a.h"')
+    header.write_text("int a;")
+
+    c = Context(str(tmp_path))
+    commands: list[str] = []
+
+    def run(command: str, on_line=None, **kw) -> Result:
+        commands.append(command)
+        on_line(f"{msvc.SHOW_INCLUDES_PREFIX} {header}")
+        output.write_text(f"object of {header.read_text()}")
+        return Result(return_code=0, output=None)
+
+    c.run = run  # type: ignore[method-assign]
+
+    def compile() -> None:
+        msvc.compile(
+            c,
+            [str(source)],
+            output=str(output),
+            output_kind=msvc.OutputKind.OBJECT_FILE,
+            only_compilation=True,
+            use_build_cache=True,
+        )
+
+    compile()
+    assert len(commands) == 1 and " /showIncludes " in commands[0]
+
+    output.unlink()
+    compile()
+    assert len(commands) == 1
+    assert output.read_text() == "object of int a;"
+
+    header.write_text("int b;")
+    compile()
+    assert len(commands) == 2
+
+    monkeypatch.setenv("INCLUDE", "second")
+    compile()
+    assert len(commands) == 3
+
+
+def test_option_flags_tell_mp_true_from_mp_one():
+    options = dict(
+        only_compilation=True,
+        only_preprocessor=False,
+        produce_pdb=False,
+        embed_debug_info=False,
+        use_ccache=False,
+        optimization_level=None,
+        cg_threads=None,
+        language_standard=None,
+        runtime_library=None,
+        exception_handle=None,
+        debug_info_mode=None,
+        fast_link=False,
+        is_dll=False,
+    )
+
+    assert "/MP1" in msvc.format_option_flags(mp_processes=1, **options)[0]
+    assert "/MP" in msvc.format_option_flags(mp_processes=True, **options)[0]
+
+
+def test_link_uses_fastlink_only_for_debug_information(tmp_path):
+    c = Context(str(tmp_path))
+    commands = capture_commands(c)
+
+    msvc.link(c, ["a.obj"], output="a.exe")
+    msvc.link(c, ["a.obj"], output="a.exe", produce_pdb=True)
+
+    assert "/DEBUG" not in commands[0] and "/INCREMENTAL" not in commands[0]
+    assert "/DEBUG:FASTLINK" in commands[1] and "/INCREMENTAL" in commands[1]
+
+
+def test_vcvars_are_probed_once_per_process(tmp_path, monkeypatch):
+    probed: list[str] = []
+
+    def exists(path: str) -> bool:
+        probed.append(path)
+        return False
+
+    msvc._find_vcvars.cache_clear()
+    monkeypatch.setattr(msvc.os.path, "exists", exists)
+
+    assert msvc.find_vcvars(Context(str(tmp_path))) is None
+    assert msvc.find_vcvars(Context(str(tmp_path))) is None
+    assert len(probed) == 2
+
+    msvc._find_vcvars.cache_clear()